@@ -16,42 +16,259 @@ API 端点:
 
 import asyncio
 import base64
+import importlib.util
 import json
 import logging
-import os
-import tempfile
+import sys
 import threading
-from typing import TYPE_CHECKING, Set
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import numpy as np
 
+# JSON 编解码: 优先 msgspec，其次 orjson，都未安装时使用标准库 json
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 音频文件解码与重采样依赖在模块加载时导入，避免每个请求都走导入流程
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+# 可选: soxr 直接重采样（比 librosa.resample 开销更低），未安装时回退到 librosa
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+librosa = None
+if soxr is None:
+    try:
+        import librosa
+    except ImportError:
+        pass
+
 if TYPE_CHECKING:
     from funasr_live import FunASRLive, Config
 
 logger = logging.getLogger("FunASR-API")
 
 # 全局变量存储 WebSocket 连接
-_websocket_clients: Set = set()
+# 使用不可变元组（写时复制）：读取方直接遍历当前快照，无需加锁或复制；
+# 增删连接时在锁内整体替换
+_websocket_clients: Tuple = ()
+_clients_lock = threading.Lock()
 _app_instance: "FunASRLive" = None
+# API 服务器所在的事件循环，供工作线程提交广播任务
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# 广播时每批并发发送的客户端数量
+_BROADCAST_BATCH_SIZE = 50
+
+# 单次识别的最大音频时长，超出部分只保留最近的音频，限制推理开销
+MAX_AUDIO_SECONDS = 30
+MAX_SAMPLES = 16000 * MAX_AUDIO_SECONDS
+
+# /api/status 响应缓存: (生成时间, 已编码的 JSON)，在 TTL 内直接复用
+STATUS_CACHE_TTL = 0.1
+_status_cache: Tuple[float, bytes] = (0.0, b"")
+
+# 热路径中使用的时间函数，绑定为模块级引用
+_time = time.time
+_monotonic = time.monotonic
+
+
+# ========== WebSocket 消息类型 ==========
+# 消息结构使用 dataclass 声明，msgspec 与 orjson 都能在 C 层直接序列化；
+# "type" 字段取默认值，构造时无需传入
+
+@dataclass
+class ResultMsg:
+    """识别结果"""
+    text: str
+    timestamp: float
+    type: str = "result"
+
+
+@dataclass
+class RecordingStartedMsg:
+    """开始录音"""
+    type: str = "recording_started"
+
+
+@dataclass
+class RecordingStoppedMsg:
+    """停止录音"""
+    type: str = "recording_stopped"
+
+
+@dataclass
+class RecordingCancelledMsg:
+    """取消录音"""
+    type: str = "recording_cancelled"
+
+
+@dataclass
+class ConnectedMsg:
+    """连接成功时的初始状态"""
+    is_recording: bool
+    latest_result: str
+    type: str = "connected"
+
+
+@dataclass
+class StatusMsg:
+    """状态查询响应"""
+    is_recording: bool
+    latest_result: str
+    type: str = "status"
+
+
+@dataclass
+class ErrorMsg:
+    """错误信息"""
+    message: str
+    type: str = "error"
+
+
+@dataclass
+class ClientAction:
+    """客户端发送的控制命令"""
+    action: str = ""
+
+
+# ========== JSON 编解码 ==========
+# 优先使用 msgspec，其次 orjson，最后回退到标准库 json；
+# 三者输出均为 UTF-8 字节串，且不转义非 ASCII 字符
+
+if msgspec is not None:
+    _encode = msgspec.json.Encoder().encode
+    _decode_action = msgspec.json.Decoder(ClientAction).decode
+    _DECODE_ERRORS = (msgspec.DecodeError,)
+else:
+    if orjson is not None:
+        _encode = orjson.dumps
+        _loads = orjson.loads
+    else:
+        def _encode(obj) -> bytes:
+            return json.dumps(
+                obj, ensure_ascii=False, separators=(",", ":"), default=asdict
+            ).encode("utf-8")
+        _loads = json.loads
+        
+    def _decode_action(data) -> ClientAction:
+        msg = _loads(data)
+        if not isinstance(msg, dict) or not isinstance(msg.get("action", ""), str):
+            raise ValueError("无效的客户端命令")
+        return ClientAction(action=msg.get("action", ""))
+        
+    _DECODE_ERRORS = (ValueError,)
+
+# 不含可变字段的状态消息只需编码一次，之后直接复用字节串
+_BROADCAST_CACHE = {
+    "recording_started": _encode(RecordingStartedMsg()),
+    "recording_stopped": _encode(RecordingStoppedMsg()),
+    "recording_cancelled": _encode(RecordingCancelledMsg()),
+}
+
+
+def _pcm16_to_float32(pcm: np.ndarray) -> np.ndarray:
+    """将 int16 PCM 转换为 [-1, 1) 范围的 float32，转换与缩放在一次遍历中完成"""
+    audio = np.empty(pcm.shape[0], dtype=np.float32)
+    np.multiply(pcm, np.float32(1.0 / 32768.0), out=audio, dtype=np.float32)
+    return audio
+
+
+def _trim_audio(audio_data: np.ndarray) -> np.ndarray:
+    """超过 MAX_AUDIO_SECONDS 时只保留最后一段音频（视图，不复制）"""
+    if len(audio_data) > MAX_SAMPLES:
+        logger.warning(
+            f"音频时长 {len(audio_data) / 16000:.1f}s 超过上限 {MAX_AUDIO_SECONDS}s，"
+            f"仅识别最后 {MAX_AUDIO_SECONDS}s"
+        )
+        return audio_data[-MAX_SAMPLES:]
+    return audio_data
+
+
+def _invalidate_status_cache():
+    """录音状态变化时使状态缓存失效，保证客户端立即看到新状态"""
+    global _status_cache
+    _status_cache = (0.0, b"")
+
+
+def _add_client(websocket):
+    """登记 WebSocket 连接"""
+    global _websocket_clients
+    with _clients_lock:
+        _websocket_clients = _websocket_clients + (websocket,)
+
+
+def _remove_clients(*websockets):
+    """移除 WebSocket 连接"""
+    global _websocket_clients
+    with _clients_lock:
+        _websocket_clients = tuple(c for c in _websocket_clients if c not in websockets)
+
+
+async def _broadcast(payload: bytes, clients: Optional[Tuple] = None):
+    """
+    向所有 WebSocket 客户端广播已编码的消息
+
+    客户端较少时逐个发送；较多时按批次并发发送，批次之间让出事件循环，
+    避免长时间占用。发送失败的连接会被一次性移除。
+
+    Args:
+        payload: 已编码的 JSON 消息
+        clients: 客户端快照，默认使用当前连接
+    """
+    if clients is None:
+        clients = _websocket_clients
+    if not clients:
+        return
+        
+    dead = []
+    if len(clients) <= _BROADCAST_BATCH_SIZE:
+        for ws in clients:
+            try:
+                await ws.send_bytes(payload)
+            except Exception:
+                dead.append(ws)
+    else:
+        for i in range(0, len(clients), _BROADCAST_BATCH_SIZE):
+            batch = clients[i:i + _BROADCAST_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(ws.send_bytes(payload) for ws in batch),
+                return_exceptions=True
+            )
+            dead.extend(ws for ws, r in zip(batch, results) if isinstance(r, Exception))
+            await asyncio.sleep(0)
+            
+    if dead:
+        _remove_clients(*dead)
+        logger.warning(f"WebSocket 发送失败，已移除 {len(dead)} 个连接")
 
 
 def _notify_websocket_clients(text: str):
-    """通知所有 WebSocket 客户端"""
-    if not _websocket_clients:
+    """通知所有 WebSocket 客户端（可从任意线程调用）"""
+    # 只读取一次全局快照：元组不可变，无需复制即可安全遍历
+    clients = _websocket_clients
+    loop = _loop
+    if not clients or loop is None:
         return
         
-    message = json.dumps({
-        "type": "result",
-        "text": text,
-        "timestamp": __import__('time').time()
-    })
+    message = _encode(ResultMsg(text=text, timestamp=_time()))
     
-    # 在事件循环中发送消息
-    for ws in list(_websocket_clients):
-        try:
-            asyncio.create_task(ws.send_text(message))
-        except Exception as e:
-            logger.error(f"WebSocket 发送失败: {e}")
+    # 识别回调运行在工作线程中，整个广播作为一个协程线程安全地提交到事件循环
+    asyncio.run_coroutine_threadsafe(_broadcast(message, clients), loop)
 
 
 def create_app(funasr_live: "FunASRLive"):
@@ -61,12 +278,15 @@ def create_app(funasr_live: "FunASRLive"):
     
     from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.middleware.gzip import GZipMiddleware
+    from fastapi.responses import JSONResponse, ORJSONResponse, Response
     
+    # orjson 序列化更快，且不会把中文转义成 \uXXXX，显著减小识别结果的响应体积
     app = FastAPI(
         title="FunASR Live API",
         description="Mac MPS 实时语音识别服务 API",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=ORJSONResponse if orjson is not None else JSONResponse
     )
     
     # 添加 CORS 支持
@@ -78,6 +298,9 @@ def create_app(funasr_live: "FunASRLive"):
         allow_headers=["*"],
     )
     
+    # 压缩较大的响应体（长识别结果等），小响应不受影响
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+    
     # 注册结果回调
     funasr_live.register_result_callback(_notify_websocket_clients)
     
@@ -104,7 +327,13 @@ def create_app(funasr_live: "FunASRLive"):
     @app.get("/api/status")
     async def get_status():
         """获取服务状态"""
-        return {
+        global _status_cache
+        now = _monotonic()
+        cached_at, body = _status_cache
+        if now - cached_at < STATUS_CACHE_TTL:
+            return Response(body, media_type="application/json")
+            
+        body = _encode({
             "status": "running",
             "is_recording": funasr_live.recorder.is_recording,
             "device": funasr_live.asr_engine.device,
@@ -115,7 +344,9 @@ def create_app(funasr_live: "FunASRLive"):
                 "hotkey_cancel": funasr_live.config.hotkey_cancel,
             },
             "websocket_clients": len(_websocket_clients)
-        }
+        })
+        _status_cache = (now, body)
+        return Response(body, media_type="application/json")
     
     @app.get("/api/result")
     async def get_result():
@@ -128,7 +359,8 @@ def create_app(funasr_live: "FunASRLive"):
     @app.post("/api/recognize")
     async def recognize_audio(
         file: UploadFile = File(None),
-        audio_base64: str = None
+        audio_base64: str = None,
+        sample_format: str = "float32"
     ):
         """
         上传音频文件进行识别
@@ -136,46 +368,61 @@ def create_app(funasr_live: "FunASRLive"):
         支持两种方式:
         1. 上传音频文件 (multipart/form-data)
         2. 发送 base64 编码的音频数据 (application/json)
+        
+        base64 数据为 16kHz 单声道 PCM，sample_format 指定采样格式:
+        - "float32": 32 位浮点，范围 [-1, 1]（默认）
+        - "int16":   16 位小端整数，体积为 float32 的一半，推荐使用
         """
         try:
             audio_data = None
             
             if file:
-                # 从上传的文件读取
-                content = await file.read()
-                
-                # 保存到临时文件
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                    tmp.write(content)
-                    tmp_path = tmp.name
-                
-                try:
-                    # 使用 soundfile 或 librosa 读取音频
-                    import soundfile as sf
-                    audio_data, sr = sf.read(tmp_path)
+                if sf is None:
+                    raise HTTPException(status_code=500, detail="未安装 soundfile，无法解码音频文件")
                     
-                    # 如果采样率不是 16000，需要重采样
-                    if sr != 16000:
-                        import librosa
-                        audio_data = librosa.resample(audio_data, orig_sr=sr, target_sr=16000)
-                finally:
-                    os.unlink(tmp_path)
+                # 直接从上传文件对象（SpooledTemporaryFile）分块解码，不把整个文件读入内存；
+                # 读取为 float32 省去后续类型转换，并在线程池中执行避免阻塞事件循环
+                audio_data, sr = await asyncio.to_thread(
+                    sf.read, file.file, dtype='float32', always_2d=False
+                )
+                
+                # 如果采样率不是 16000，需要重采样
+                if sr != 16000:
+                    if soxr is not None:
+                        audio_data = await asyncio.to_thread(
+                            soxr.resample, audio_data, sr, 16000, quality='HQ'
+                        )
+                    elif librosa is not None:
+                        audio_data = await asyncio.to_thread(
+                            librosa.resample, audio_data, orig_sr=sr, target_sr=16000
+                        )
+                    else:
+                        raise HTTPException(status_code=500, detail="未安装 soxr 或 librosa，无法重采样音频")
                     
             elif audio_base64:
                 # 从 base64 解码
                 audio_bytes = base64.b64decode(audio_base64)
-                audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
+                if sample_format == "int16":
+                    audio_data = _pcm16_to_float32(np.frombuffer(audio_bytes, dtype=np.int16))
+                elif sample_format == "float32":
+                    audio_data = np.frombuffer(audio_bytes, dtype=np.float32)
+                else:
+                    raise HTTPException(status_code=400, detail=f"不支持的采样格式: {sample_format}")
             else:
                 raise HTTPException(status_code=400, detail="请提供音频文件或 base64 编码的音频数据")
             
-            # 执行识别
-            text = funasr_live.asr_engine.recognize(audio_data)
+            audio_data = _trim_audio(audio_data)
+            
+            # 在线程池中执行识别，避免阻塞事件循环
+            text = await asyncio.to_thread(funasr_live.asr_engine.recognize, audio_data)
             
             return {
                 "success": True,
                 "text": text
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"识别错误: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -187,14 +434,10 @@ def create_app(funasr_live: "FunASRLive"):
             return {"success": False, "message": "已经在录音中"}
             
         funasr_live.recorder.start_recording()
+        _invalidate_status_cache()
         
         # 通知 WebSocket 客户端
-        message = json.dumps({"type": "recording_started"})
-        for ws in list(_websocket_clients):
-            try:
-                await ws.send_text(message)
-            except:
-                pass
+        await _broadcast(_BROADCAST_CACHE["recording_started"])
                 
         return {"success": True, "message": "开始录音"}
     
@@ -204,27 +447,22 @@ def create_app(funasr_live: "FunASRLive"):
         if not funasr_live.recorder.is_recording:
             return {"success": False, "message": "当前没有在录音"}
             
-        audio_data = funasr_live.recorder.stop_recording()
+        audio_data = _trim_audio(funasr_live.recorder.stop_recording())
+        _invalidate_status_cache()
         
         # 通知 WebSocket 客户端
-        message = json.dumps({"type": "recording_stopped"})
-        for ws in list(_websocket_clients):
-            try:
-                await ws.send_text(message)
-            except:
-                pass
+        await _broadcast(_BROADCAST_CACHE["recording_stopped"])
         
         if len(audio_data) > 0:
-            # 执行识别
-            text = funasr_live.asr_engine.recognize(audio_data)
+            # 在线程池中执行识别，避免阻塞事件循环
+            text = await asyncio.to_thread(funasr_live.asr_engine.recognize, audio_data)
             
             if text:
                 # 输出结果
                 funasr_live.output_handler.output(text)
                 
                 # 更新最新结果
-                with funasr_live._result_lock:
-                    funasr_live._latest_result = text
+                funasr_live._set_latest_result(text)
                     
                 # 通知回调
                 _notify_websocket_clients(text)
@@ -242,14 +480,10 @@ def create_app(funasr_live: "FunASRLive"):
             return {"success": False, "message": "当前没有在录音"}
             
         funasr_live.recorder.cancel_recording()
+        _invalidate_status_cache()
         
         # 通知 WebSocket 客户端
-        message = json.dumps({"type": "recording_cancelled"})
-        for ws in list(_websocket_clients):
-            try:
-                await ws.send_text(message)
-            except:
-                pass
+        await _broadcast(_BROADCAST_CACHE["recording_cancelled"])
                 
         return {"success": True, "message": "录音已取消"}
     
@@ -267,84 +501,95 @@ def create_app(funasr_live: "FunASRLive"):
           - {"type": "recording_stopped"}
           - {"type": "recording_cancelled"}
           - {"type": "status", "is_recording": true/false}
+          - {"type": "connected", "is_recording": true/false, "latest_result": "..."}
         
         - 客户端可发送:
+          - {"action": "hello"}   - 重新获取 connected 初始状态（连接建立时服务端已主动发送一次）
           - {"action": "start"}   - 开始录音
           - {"action": "stop"}    - 停止录音
           - {"action": "cancel"}  - 取消录音
           - {"action": "status"}  - 获取状态
         """
+        global _loop
+        _loop = asyncio.get_running_loop()
+        
         await websocket.accept()
-        _websocket_clients.add(websocket)
+        _add_client(websocket)
         logger.info(f"WebSocket 客户端连接，当前连接数: {len(_websocket_clients)}")
         
         try:
-            # 发送初始状态
-            await websocket.send_text(json.dumps({
-                "type": "connected",
-                "is_recording": funasr_live.recorder.is_recording,
-                "latest_result": funasr_live.get_latest_result()
-            }))
+            # 发送初始状态（已有客户端依赖连接后立即收到 connected）
+            await websocket.send_bytes(_encode(ConnectedMsg(
+                is_recording=funasr_live.recorder.is_recording,
+                latest_result=funasr_live.get_latest_result()
+            )))
             
             while True:
-                # 接收客户端消息
-                data = await websocket.receive_text()
+                # 接收客户端消息（文本帧或二进制帧），直接交给 msgspec 解码，
+                # 不再经过 receive_text 的额外 UTF-8 解码
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                data = message.get("bytes") or message.get("text") or b""
                 
                 try:
-                    msg = json.loads(data)
-                    action = msg.get("action")
+                    action = _decode_action(data).action
                     
                     if action == "start":
                         if not funasr_live.recorder.is_recording:
                             funasr_live.recorder.start_recording()
-                            await websocket.send_text(json.dumps({"type": "recording_started"}))
+                            _invalidate_status_cache()
+                            await websocket.send_bytes(_BROADCAST_CACHE["recording_started"])
                             
                     elif action == "stop":
                         if funasr_live.recorder.is_recording:
-                            audio_data = funasr_live.recorder.stop_recording()
-                            await websocket.send_text(json.dumps({"type": "recording_stopped"}))
+                            audio_data = _trim_audio(funasr_live.recorder.stop_recording())
+                            _invalidate_status_cache()
+                            await websocket.send_bytes(_BROADCAST_CACHE["recording_stopped"])
                             
                             if len(audio_data) > 0:
-                                # 在后台线程中执行识别
-                                def recognize():
-                                    text = funasr_live.asr_engine.recognize(audio_data)
-                                    if text:
-                                        funasr_live.output_handler.output(text)
-                                        with funasr_live._result_lock:
-                                            funasr_live._latest_result = text
-                                        _notify_websocket_clients(text)
-                                        
-                                threading.Thread(target=recognize).start()
+                                # 交给识别工作线程，与快捷键录音同一路径：不阻塞本连接的接收循环，
+                                # 结果经 register_result_callback 注册的回调推送给所有客户端
+                                funasr_live._process_audio(audio_data)
                                 
                     elif action == "cancel":
                         if funasr_live.recorder.is_recording:
                             funasr_live.recorder.cancel_recording()
-                            await websocket.send_text(json.dumps({"type": "recording_cancelled"}))
+                            _invalidate_status_cache()
+                            await websocket.send_bytes(_BROADCAST_CACHE["recording_cancelled"])
                             
+                    elif action == "hello":
+                        # 按需再次返回初始状态
+                        await websocket.send_bytes(_encode(ConnectedMsg(
+                            is_recording=funasr_live.recorder.is_recording,
+                            latest_result=funasr_live.get_latest_result()
+                        )))
+                        
                     elif action == "status":
-                        await websocket.send_text(json.dumps({
-                            "type": "status",
-                            "is_recording": funasr_live.recorder.is_recording,
-                            "latest_result": funasr_live.get_latest_result()
-                        }))
+                        await websocket.send_bytes(_encode(StatusMsg(
+                            is_recording=funasr_live.recorder.is_recording,
+                            latest_result=funasr_live.get_latest_result()
+                        )))
                         
-                except json.JSONDecodeError:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": "无效的 JSON 格式"
-                    }))
+                except _DECODE_ERRORS:
+                    await websocket.send_bytes(_encode(ErrorMsg(message="无效的 JSON 格式")))
                     
         except WebSocketDisconnect:
             pass
         finally:
-            _websocket_clients.discard(websocket)
+            _remove_clients(websocket)
             logger.info(f"WebSocket 客户端断开，当前连接数: {len(_websocket_clients)}")
     
     return app
 
 
-def run_api_server(funasr_live: "FunASRLive", config: "Config"):
-    """运行 API 服务器"""
+# 优先使用 uvloop + httptools，不可用时（如 Windows 或未安装）回退到默认实现
+_USE_UVLOOP = sys.platform != "win32" and importlib.util.find_spec("uvloop") is not None
+_USE_HTTPTOOLS = importlib.util.find_spec("httptools") is not None
+
+
+def _uvicorn_config(funasr_live: "FunASRLive", config: "Config"):
+    """创建应用并构造 uvicorn 配置"""
     import uvicorn
     
     app = create_app(funasr_live)
@@ -352,14 +597,64 @@ def run_api_server(funasr_live: "FunASRLive", config: "Config"):
     logger.info(f"🌐 API 服务器启动: http://{config.api_host}:{config.api_port}")
     logger.info(f"📡 WebSocket 地址: ws://{config.api_host}:{config.api_port}/ws")
     
-    uvicorn.run(
+    return uvicorn.Config(
         app,
         host=config.api_host,
         port=config.api_port,
-        log_level="warning"
+        log_level="warning",
+        loop="uvloop" if _USE_UVLOOP else "asyncio",
+        http="httptools" if _USE_HTTPTOOLS else "h11",
+        ws="auto",
     )
 
 
+def run_api_server(funasr_live: "FunASRLive", config: "Config"):
+    """运行 API 服务器（阻塞，自行创建事件循环）"""
+    import uvicorn
+    
+    uvicorn.Server(_uvicorn_config(funasr_live, config)).run()
+
+
+async def serve_api_server(funasr_live: "FunASRLive", config: "Config"):
+    """在当前事件循环中运行 API 服务器"""
+    import uvicorn
+    
+    global _loop
+    _loop = asyncio.get_running_loop()
+    server = uvicorn.Server(_uvicorn_config(funasr_live, config))
+    serve_task = asyncio.ensure_future(server.serve())
+    try:
+        await asyncio.shield(serve_task)
+    except asyncio.CancelledError:
+        # 被取消时让 uvicorn 正常关闭（断开连接、执行 lifespan shutdown）
+        server.should_exit = True
+        await serve_task
+        raise
+
+
+def run_event_loop(main):
+    """在新的事件循环中运行协程直到完成，可用时使用 uvloop"""
+    if _USE_UVLOOP:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    else:
+        loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            # 与 asyncio.run 一致：取消残留任务后再关闭循环
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+
 # 独立运行测试
 if __name__ == "__main__":
     print("API 服务器模块 - 请通过 funasr_live.py 启动")
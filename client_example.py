@@ -6,52 +6,57 @@ FunASR Live 客户端示例
 """
 
 import asyncio
+import atexit
 import json
 import sys
 import time
 
-import requests
+import httpx
 
 # API 基础地址
 API_BASE = "http://127.0.0.1:8765"
 WS_URL = "ws://127.0.0.1:8765/ws"
 
+# 复用同一个连接池，避免每次请求重新建立 TCP 连接
+_CLIENT = httpx.Client(base_url=API_BASE, timeout=30.0)
+atexit.register(_CLIENT.close)
+
 
 def get_status():
     """获取服务状态"""
-    response = requests.get(f"{API_BASE}/api/status")
+    response = _CLIENT.get("/api/status")
     return response.json()
 
 
 def get_result():
     """获取最新识别结果"""
-    response = requests.get(f"{API_BASE}/api/result")
+    response = _CLIENT.get("/api/result")
     return response.json()
 
 
 def start_recording():
     """开始录音"""
-    response = requests.post(f"{API_BASE}/api/control/start")
+    response = _CLIENT.post("/api/control/start")
     return response.json()
 
 
 def stop_recording():
     """停止录音并获取识别结果"""
-    response = requests.post(f"{API_BASE}/api/control/stop")
+    response = _CLIENT.post("/api/control/stop")
     return response.json()
 
 
 def cancel_recording():
     """取消录音"""
-    response = requests.post(f"{API_BASE}/api/control/cancel")
+    response = _CLIENT.post("/api/control/cancel")
     return response.json()
 
 
 def recognize_file(file_path: str):
     """识别音频文件"""
     with open(file_path, 'rb') as f:
-        response = requests.post(
-            f"{API_BASE}/api/recognize",
+        response = _CLIENT.post(
+            "/api/recognize",
             files={'file': f}
         )
     return response.json()
@@ -193,7 +198,7 @@ def interactive_demo():
         except KeyboardInterrupt:
             print("\n退出")
             break
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             print("❌ 无法连接到服务器，请确保 FunASR Live 正在运行")
         except Exception as e:
             print(f"错误: {e}")
@@ -265,7 +270,7 @@ def main():
         else:
             print(f"未知命令: {cmd}")
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ 无法连接到服务器")
         print("请确保 FunASR Live 正在运行: python funasr_live.py")
 
@@ -10,6 +10,9 @@ FunASR Live - Mac MPS 实时语音识别工具
 """
 
 import asyncio
+import contextlib
+import copy
+import functools
 import logging
 import os
 import queue
@@ -20,7 +23,7 @@ import time
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 
 import numpy as np
 import sounddevice as sd
@@ -28,6 +31,22 @@ import torch
 import yaml
 from pynput import keyboard
 
+try:
+    # 进程内写剪贴板（NSPasteboard）并直接投递 Cmd+V 键盘事件（Quartz），
+    # 避免每次结果都 fork pbcopy/osascript。
+    # 不使用 NSAppleScript：它只能在主线程执行，而粘贴发生在推理线程与 asyncio 工作线程
+    from AppKit import NSPasteboard, NSPasteboardTypeString
+except ImportError:
+    NSPasteboard = None
+
+try:
+    import Quartz
+except ImportError:
+    Quartz = None
+
+PASTE_SCRIPT = 'tell application "System Events" to keystroke "v" using command down'
+_KEYCODE_V = 9  # ANSI 键盘上 V 键的虚拟键码
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +55,13 @@ logging.basicConfig(
 logger = logging.getLogger("FunASR-Live")
 
 
+@functools.lru_cache(maxsize=4)
+def _load_yaml(path: str, mtime: float) -> dict:
+    """解析 YAML 文件；以 (路径, 修改时间) 为键缓存，文件改动后自动重新解析"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
 class OutputMode(Enum):
     """输出模式枚举"""
     CLIPBOARD = "clipboard"      # 复制到剪贴板
@@ -63,6 +89,7 @@ class Config:
     channels: int = 1
     chunk_duration: float = 0.5  # 每个音频块的时长（秒）
     audio_device: Optional[int] = None  # 音频输入设备索引
+    max_record_duration: float = 120.0  # 单次录音最大时长（秒），超出后保留最新部分
     
     # 快捷键配置
     hotkey_start_stop: str = "ctrl+alt+r"  # 开始/停止录音
@@ -89,8 +116,8 @@ class Config:
             logger.warning(f"配置文件不存在: {path}，使用默认配置")
             return cls()
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+            # 缓存的字典是共享的，深拷贝后再交给 Config，避免 hotwords 等列表被改动
+            data = copy.deepcopy(_load_yaml(path, os.path.getmtime(path)))
             logger.info(f"已加载配置文件: {path}")
             # 只保留 Config 类有的属性
             valid_data = {k: v for k, v in data.items() if hasattr(cls, k)}
@@ -112,6 +139,7 @@ class Config:
             'sample_rate': self.sample_rate,
             'channels': self.channels,
             'chunk_duration': self.chunk_duration,
+            'max_record_duration': self.max_record_duration,
             'hotkey_start_stop': self.hotkey_start_stop,
             'hotkey_cancel': self.hotkey_cancel,
             'output_mode': self.output_mode,
@@ -130,11 +158,19 @@ class Config:
 class ASREngine:
     """语音识别引擎"""
     
+    _DTYPE_MAP = {"fp16": torch.float16, "bf16": torch.bfloat16, "fp32": torch.float32}
+    
     def __init__(self, config: Config):
         self.config = config
         self.model = None
         self.device = None
         self._initialized = False
+        # 跨调用复用的 FunASR cache；共享状态，推理需串行。
+        # 重置时整体换成新字典而不是加锁清空，控制路径不必等待正在进行的推理
+        self._cache: dict = {}
+        self._infer_lock = threading.Lock()
+        # 权重已转换为半精度时传给 generate 的标志（fp16=True / bf16=True）
+        self._dtype_kwargs: Dict[str, bool] = {}
         
     def initialize(self):
         """初始化模型"""
@@ -175,15 +211,68 @@ class ASREngine:
             }
         
         self.model = AutoModel(**model_kwargs)
+        self.model.model.eval()
+        self._convert_weights()
+        if self.device.startswith("cuda"):
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
         self._initialized = True
         logger.info("模型初始化完成！")
         
+        self._warmup()
+        
+    def _convert_weights(self):
+        """按 config.dtype 在加载时把模型权重转为 fp16/bf16（LayerNorm 保持 fp32）"""
+        if self.config.dtype not in ("fp16", "bf16") or self.device == "cpu":
+            return
+        target = self._DTYPE_MAP[self.config.dtype]
+        model = self.model.model
+        model.to(target)
+        for module in model.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()
+        # 告知 model.py 输入特征与 LLM 使用同一精度，否则它会在每次推理时把 LLM 转回 fp32
+        self._dtype_kwargs = {self.config.dtype: True}
+        logger.info(f"模型权重已转换为 {self.config.dtype}")
+        
+    def _warmup(self):
+        """用 1 秒静音跑一次推理，提前触发 CUDA/MPS 内核编译，首次识别不再卡顿"""
+        try:
+            start = time.perf_counter()
+            silence = torch.zeros(self.config.sample_rate, dtype=torch.float32)
+            self._generate(silence)
+            self.reset_cache()
+            logger.info(f"🔥 模型预热完成 ({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            logger.warning(f"模型预热失败: {e}")
+            
+    def _generate(self, audio_tensor: torch.Tensor):
+        """执行一次推理"""
+        with self._infer_lock, torch.inference_mode(), self._autocast():
+            return self.model.generate(
+                input=[audio_tensor],
+                cache=self._cache,
+                batch_size=1,
+                hotwords=self.config.hotwords,
+                language=self.config.language,
+                itn=self.config.itn,
+                **self._dtype_kwargs,
+            )
+        
+    def _autocast(self):
+        """按 config.dtype 构造混合精度上下文（CPU 或 fp32 时不启用）"""
+        dtype = self._DTYPE_MAP.get(self.config.dtype, torch.float32)
+        if dtype is torch.float32 or self.device == "cpu":
+            return contextlib.nullcontext()
+        device_type = "cuda" if self.device.startswith("cuda") else self.device
+        return torch.autocast(device_type, dtype=dtype)
+        
     def recognize(self, audio_data: np.ndarray) -> str:
         """
         识别音频数据
         
         Args:
-            audio_data: numpy 数组，采样率应为 16000Hz
+            audio_data: float32 numpy 数组，取值范围 [-1, 1]，采样率应为 16000Hz
             
         Returns:
             识别结果文本
@@ -191,36 +280,36 @@ class ASREngine:
         if not self._initialized:
             self.initialize()
             
+        # 录音与 API 均已产出 [-1, 1] 的 float32，这里不做类型转换与归一化
+        # 类型不符是调用方错误：在 try 之外显式抛出，不受 -O 影响，也不会被当作识别失败而重置 cache
+        if audio_data.dtype != np.float32:
+            raise TypeError(f"音频数据应为 float32，实际为 {audio_data.dtype}")
+        
         try:
-            # 确保音频数据是正确的格式
-            if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32)
-            
-            # 归一化
-            if np.abs(audio_data).max() > 1.0:
-                audio_data = audio_data / 32768.0
-                
-            # 转换为 tensor
-            audio_tensor = torch.from_numpy(audio_data)
+            # 转换为 tensor：保证连续内存，from_numpy 直接共享缓冲区不再复制。
+            # 不预先搬到 GPU/MPS —— FunASR 在 CPU 上做 VAD 与 fbank 特征提取，
+            # 之后才把特征送到模型设备，提前搬运原始波形只会多一次往返
+            audio_tensor = torch.from_numpy(np.ascontiguousarray(audio_data))
             
             # 执行识别
-            result = self.model.generate(
-                input=[audio_tensor],
-                cache={},
-                batch_size=1,
-                hotwords=self.config.hotwords,
-                language=self.config.language,
-                itn=self.config.itn,
-            )
+            result = self._generate(audio_tensor)
             
             if result and len(result) > 0:
-                text = result[0].get("text", "")
-                return text.strip()
+                return result[0].get("text", "").strip()
             return ""
             
         except Exception as e:
             logger.error(f"识别错误: {e}")
+            # 出错时 cache 可能残留半途状态
+            self.reset_cache()
             return ""
+            
+    def reset_cache(self):
+        """清空跨调用复用的 cache；可在热键等任意线程调用，不获取推理锁。
+        
+        正在进行的推理仍写入旧字典，随后被丢弃；下一次 generate 读取到的是新的空字典。
+        """
+        self._cache = {}
 
 
 class AudioRecorder:
@@ -228,61 +317,65 @@ class AudioRecorder:
     
     def __init__(self, config: Config):
         self.config = config
-        self.audio_queue = queue.Queue()
         self.is_recording = False
         self.stream = None
-        self._recorded_frames: List[np.ndarray] = []
+        # 预分配环形缓冲区：音频回调线程只做切片赋值，不分配内存
+        self._ring = np.empty(
+            int(config.sample_rate * config.max_record_duration), dtype=np.float32
+        )
+        self._write_idx = 0  # 累计写入的采样数（单生产者，仅回调线程写）
         self._input_device = None
+        self._devices: List[dict] = []
         self._init_audio_device()
         
     def _init_audio_device(self):
         """初始化音频设备"""
+        # 只枚举一次设备，后续检查都基于这份列表（也供外部重新选择设备时复用）
+        try:
+            self._devices = list(sd.query_devices())
+        except Exception as e:
+            logger.error(f"枚举音频设备失败: {e}")
+            self._devices = []
+        devices = self._devices
+        
         # 首先检查配置文件中是否指定了设备
         if self.config.audio_device is not None:
-            try:
-                device_info = sd.query_devices(self.config.audio_device)
+            device_index = self.config.audio_device
+            if 0 <= device_index < len(devices):
+                device_info = devices[device_index]
                 if device_info['max_input_channels'] > 0:
-                    self._input_device = self.config.audio_device
-                    logger.info(f"🎙️ 使用配置的音频输入设备: [{self.config.audio_device}] {device_info['name']}")
+                    self._input_device = device_index
+                    logger.info(f"🎙️ 使用配置的音频输入设备: [{device_index}] {device_info['name']}")
                     return
                 else:
-                    logger.warning(f"配置的设备 [{self.config.audio_device}] 不是输入设备")
-            except Exception as e:
-                logger.warning(f"配置的音频设备无效: {e}")
+                    logger.warning(f"配置的设备 [{device_index}] 不是输入设备")
+            else:
+                logger.warning(f"配置的音频设备无效: 索引 {device_index} 不存在")
         
         # 尝试获取默认输入设备
         try:
             default_input = sd.default.device[0]
-            if default_input >= 0:
-                device_info = sd.query_devices(default_input)
+            if 0 <= default_input < len(devices):
                 self._input_device = default_input
-                logger.info(f"🎙️ 使用默认音频输入设备: [{default_input}] {device_info['name']}")
+                logger.info(f"🎙️ 使用默认音频输入设备: [{default_input}] {devices[default_input]['name']}")
                 return
         except Exception as e:
             logger.warning(f"获取默认音频设备失败: {e}")
         
-        # 尝试列出所有设备并选择第一个输入设备
-        try:
-            devices = sd.query_devices()
-            for i, dev in enumerate(devices):
-                if dev['max_input_channels'] > 0:
-                    self._input_device = i
-                    logger.info(f"🎙️ 使用备选音频输入设备: [{i}] {dev['name']}")
-                    return
-        except Exception as e2:
-            logger.error(f"无法找到可用的音频输入设备: {e2}")
+        # 选择第一个输入设备
+        for i, dev in enumerate(devices):
+            if dev['max_input_channels'] > 0:
+                self._input_device = i
+                logger.info(f"🎙️ 使用备选音频输入设备: [{i}] {dev['name']}")
+                return
         
         # 列出所有设备帮助用户诊断
         logger.error("❌ 没有找到可用的音频输入设备！")
         logger.info("可用的音频设备列表:")
-        try:
-            devices = sd.query_devices()
-            for i, dev in enumerate(devices):
-                input_ch = dev['max_input_channels']
-                output_ch = dev['max_output_channels']
-                logger.info(f"  [{i}] {dev['name']} - 输入: {input_ch}ch, 输出: {output_ch}ch")
-        except:
-            pass
+        for i, dev in enumerate(devices):
+            input_ch = dev['max_input_channels']
+            output_ch = dev['max_output_channels']
+            logger.info(f"  [{i}] {dev['name']} - 输入: {input_ch}ch, 输出: {output_ch}ch")
         logger.info("请连接麦克风或使用 settings_gui.py 选择音频设备")
         
     def _audio_callback(self, indata, frames, time_info, status):
@@ -290,8 +383,38 @@ class AudioRecorder:
         if status:
             logger.warning(f"音频状态: {status}")
         if self.is_recording:
-            self._recorded_frames.append(indata.copy())
-            self.audio_queue.put(indata.copy())
+            self._write_ring(indata[:, 0])
+    
+    def _write_ring(self, samples: np.ndarray):
+        """写入环形缓冲区，写满后覆盖最旧的数据"""
+        capacity = len(self._ring)
+        n = len(samples)
+        if n > capacity:
+            # 只有最后 capacity 个样本会留下，前面的直接跳过（仍计入写入位置）
+            self._write_idx += n - capacity
+            samples = samples[-capacity:]
+            n = capacity
+        pos = self._write_idx % capacity
+        first = min(n, capacity - pos)
+        self._ring[pos:pos + first] = samples[:first]
+        if first < n:
+            self._ring[:n - first] = samples[first:]
+        self._write_idx += n
+    
+    def _read_ring(self) -> np.ndarray:
+        """
+        按时间顺序取出已录制的音频
+        
+        返回已写入部分的副本（大小与录音时长成正比），环形缓冲区本身在下一次录音时复用，
+        返回的数组在识别完成前不会被覆盖。
+        """
+        capacity = len(self._ring)
+        total = self._write_idx
+        if total <= capacity:
+            return self._ring[:total].copy()
+        logger.warning(f"录音超过 {self.config.max_record_duration}s 上限，仅保留最新部分")
+        pos = total % capacity
+        return np.concatenate((self._ring[pos:], self._ring[:pos]))
             
     def start_recording(self):
         """开始录音"""
@@ -302,16 +425,9 @@ class AudioRecorder:
             logger.error("❌ 没有可用的音频输入设备")
             return
             
-        self._recorded_frames = []
+        self._write_idx = 0
         self.is_recording = True
         
-        # 清空队列
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
-        
         try:
             self.stream = sd.InputStream(
                 device=self._input_device,
@@ -341,28 +457,20 @@ class AudioRecorder:
             
         logger.info("⏹️ 停止录音")
         
-        if self._recorded_frames:
-            audio_data = np.concatenate(self._recorded_frames, axis=0)
-            return audio_data.flatten()
+        if self._write_idx:
+            return self._read_ring()
         return np.array([])
         
     def cancel_recording(self):
         """取消录音"""
         self.is_recording = False
-        self._recorded_frames = []
+        self._write_idx = 0
         
         if self.stream:
             self.stream.stop()
             self.stream.close()
             self.stream = None
             
-        # 清空队列
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
-                
         logger.info("❌ 录音已取消")
 
 
@@ -371,6 +479,10 @@ class OutputHandler:
     
     def __init__(self, config: Config):
         self.config = config
+        self._pasteboard = NSPasteboard.generalPasteboard() if NSPasteboard is not None else None
+        self._paste_lock = threading.Lock()
+        # 无 Quartz 时的回退：常驻 osascript 交互进程，粘贴只需写一行到管道
+        self._osascript = None
         
     def output(self, text: str):
         """根据配置输出文本"""
@@ -379,27 +491,80 @@ class OutputHandler:
             
         mode = OutputMode(self.config.output_mode)
         
+        copied = False
         if mode in (OutputMode.CLIPBOARD, OutputMode.BOTH):
-            self._copy_to_clipboard(text)
+            copied = self._copy_to_clipboard(text)
             
         if mode in (OutputMode.TYPE, OutputMode.BOTH):
-            self._type_text(text)
+            # 已复制到剪贴板时不再重复写入，直接粘贴
+            self._type_text(text, copied=copied)
             
-    def _copy_to_clipboard(self, text: str):
+    def _copy_to_clipboard(self, text: str) -> bool:
         """复制到剪贴板"""
         try:
-            import subprocess
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
+            self._set_clipboard(text)
             logger.info(f"📋 已复制到剪贴板: {text[:50]}...")
+            return True
         except Exception as e:
             logger.error(f"复制到剪贴板失败: {e}")
+            return False
             
-    def _type_text(self, text: str):
+    def _set_clipboard(self, text: str):
+        """写入剪贴板：优先 NSPasteboard，不可用时回退到 pbcopy"""
+        if self._pasteboard is not None:
+            self._pasteboard.clearContents()
+            self._pasteboard.setString_forType_(text, NSPasteboardTypeString)
+            return
+        import subprocess
+        process = subprocess.Popen(
+            ['pbcopy'],
+            stdin=subprocess.PIPE,
+            env={'LANG': 'en_US.UTF-8'}
+        )
+        process.communicate(text.encode('utf-8'))
+            
+    def _paste(self):
+        """模拟 Cmd+V 粘贴：优先直接投递 Quartz 键盘事件（任意线程可用），不可用时回退到 osascript"""
+        if Quartz is not None:
+            source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+            for key_down in (True, False):
+                event = Quartz.CGEventCreateKeyboardEvent(source, _KEYCODE_V, key_down)
+                Quartz.CGEventSetFlags(event, Quartz.kCGEventFlagMaskCommand)
+                Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+            return
+        with self._paste_lock:
+            self._run_osascript_line(PASTE_SCRIPT)
+            
+    def _run_osascript_line(self, line: str):
+        """在常驻的 osascript -i 进程中执行一行 AppleScript，进程退出时自动重启"""
+        import subprocess
+        for _ in range(2):
+            if self._osascript is None or self._osascript.poll() is not None:
+                self._osascript = subprocess.Popen(
+                    ['osascript', '-i'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            try:
+                self._osascript.stdin.write(line.encode('utf-8') + b'\n')
+                self._osascript.stdin.flush()
+                return
+            except (BrokenPipeError, OSError):
+                self._osascript = None
+        raise RuntimeError("osascript 进程不可用")
+        
+    def close(self):
+        """关闭常驻的 osascript 进程"""
+        if self._osascript is not None:
+            try:
+                self._osascript.stdin.close()
+                self._osascript.wait(timeout=1)
+            except Exception:
+                self._osascript.kill()
+            self._osascript = None
+            
+    def _type_text(self, text: str, copied: bool = False):
         """模拟键盘输入（支持中文）"""
         try:
             import subprocess
@@ -407,24 +572,15 @@ class OutputHandler:
             # 方法：先复制到剪贴板，然后模拟 Cmd+V 粘贴
             # 这是最可靠的中文输入方式
             
-            # 1. 复制到剪贴板
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
+            # 1. 复制到剪贴板（output 已复制过时跳过）
+            if not copied:
+                self._set_clipboard(text)
             
             # 2. 短暂延迟确保剪贴板更新
             time.sleep(0.05)
             
             # 3. 模拟 Cmd+V 粘贴
-            script = '''
-            tell application "System Events"
-                keystroke "v" using command down
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', script], check=True)
+            self._paste()
             logger.info(f"⌨️ 已模拟输入: {text[:50]}...")
             
         except Exception as e:
@@ -450,9 +606,11 @@ class HotkeyManager:
         self.config = config
         self.listener = None
         self.callbacks: Dict[str, Callable] = {}
+        # 倒排索引：按键 -> 包含该键的 (组合键, 回调) 列表，按下无关键时 O(1) 返回
+        self._trigger_map: Dict[Any, List[Tuple[frozenset, Callable]]] = {}
         self._current_keys = set()
         
-    def _parse_hotkey(self, hotkey_str: str) -> set:
+    def _parse_hotkey(self, hotkey_str: str) -> frozenset:
         """解析快捷键字符串"""
         keys = set()
         parts = hotkey_str.lower().split('+')
@@ -492,23 +650,31 @@ class HotkeyManager:
             elif len(part) == 1:
                 keys.add(keyboard.KeyCode.from_char(part))
                 
-        return keys
+        return frozenset(keys)
         
     def register(self, hotkey: str, callback: Callable):
         """注册快捷键回调"""
+        keys = self._parse_hotkey(hotkey)
         self.callbacks[hotkey] = {
-            'keys': self._parse_hotkey(hotkey),
+            'keys': keys,
             'callback': callback
         }
+        # 组合中任一键都可能是最后按下的那个，因此每个键都建立索引
+        for key in keys:
+            self._trigger_map.setdefault(key, []).append((keys, callback))
         
     def _on_press(self, key):
         """按键按下事件"""
+        # 不属于任何快捷键的按键（日常打字）直接返回，不记录也不匹配
+        triggers = self._trigger_map.get(key)
+        if triggers is None:
+            return
         self._current_keys.add(key)
         
-        for hotkey, data in self.callbacks.items():
-            if data['keys'].issubset(self._current_keys):
+        for keys, callback in triggers:
+            if keys.issubset(self._current_keys):
                 try:
-                    data['callback']()
+                    callback()
                 except Exception as e:
                     logger.error(f"快捷键回调错误: {e}")
                     
@@ -563,13 +729,21 @@ class FunASRLive:
         
         # 状态
         self._is_running = False
+        # 最新结果只整体替换 str 引用，GIL 保证读写原子，无需加锁
         self._latest_result = ""
-        self._result_lock = threading.Lock()
         self._result_callbacks: List[Callable[[str], None]] = []
         
+        # 识别工作线程：常驻单线程，按顺序处理录音
+        self._infer_queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        self._infer_thread: Optional[threading.Thread] = None
+        
         # API 服务器
         self._api_server = None
         
+        # 主事件循环（run_forever 期间有效），stop() 通过它唤醒主协程
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        
     def _on_hotkey_start_stop(self):
         """开始/停止录音快捷键回调"""
         if self.recorder.is_recording:
@@ -585,20 +759,28 @@ class FunASRLive:
         """取消录音快捷键回调"""
         if self.recorder.is_recording:
             self.recorder.cancel_recording()
+            self.asr_engine.reset_cache()
             
     def _process_audio(self, audio_data: np.ndarray):
-        """处理音频数据"""
+        """处理音频数据（交给识别工作线程，避免阻塞快捷键线程）"""
         logger.info("🔄 正在识别...")
+        # 录音结束后整段识别，而不是边录边编码：Fun-ASR-Nano 的音频编码器对整句做全局注意力，
+        # 分块编码后拼接与整段编码结果不一致，VAD 切分也需要看到完整音频才能确定边界
+        self._infer_queue.put(audio_data)
         
-        # 在新线程中执行识别，避免阻塞
-        def recognize_thread():
+    def _infer_loop(self):
+        """识别工作线程主循环，收到 None 时退出"""
+        while True:
+            audio_data = self._infer_queue.get()
+            if audio_data is None:
+                break
+            
             text = self.asr_engine.recognize(audio_data)
             if text:
                 logger.info(f"✅ 识别结果: {text}")
                 
                 # 更新最新结果
-                with self._result_lock:
-                    self._latest_result = text
+                self._set_latest_result(text)
                     
                 # 输出结果
                 self.output_handler.output(text)
@@ -611,14 +793,14 @@ class FunASRLive:
                         logger.error(f"回调错误: {e}")
             else:
                 logger.warning("⚠️ 未识别到有效内容")
-                
-        thread = threading.Thread(target=recognize_thread)
-        thread.start()
         
     def get_latest_result(self) -> str:
         """获取最新识别结果"""
-        with self._result_lock:
-            return self._latest_result
+        return self._latest_result
+        
+    def _set_latest_result(self, text: str):
+        """更新最新识别结果"""
+        self._latest_result = text
             
     def register_result_callback(self, callback: Callable[[str], None]):
         """注册结果回调函数"""
@@ -641,6 +823,10 @@ class FunASRLive:
         # 初始化 ASR 引擎
         self.asr_engine.initialize()
         
+        # 启动识别工作线程
+        self._infer_thread = threading.Thread(target=self._infer_loop, daemon=True)
+        self._infer_thread.start()
+        
         # 注册快捷键
         self.hotkey_manager.register(
             self.config.hotkey_start_stop,
@@ -673,85 +859,115 @@ class FunASRLive:
         logger.info("正在停止服务...")
         
         self.hotkey_manager.stop()
+        self.output_handler.close()
         
         if self.recorder.is_recording:
             self.recorder.cancel_recording()
             
+        # 通知识别线程退出（已排队的录音仍会处理完）
+        self._infer_queue.put(None)
+        self._infer_thread = None
+            
         self._is_running = False
+        
+        # 唤醒主协程（可能从其他线程调用）
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(stop_event.set)
+            
         logger.info("服务已停止")
         
+    async def _main(self):
+        """主协程：等待停止事件，启用 API 时在同一事件循环中运行 API 服务器"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        
+        tasks = [asyncio.ensure_future(self._stop_event.wait())]
+        if self.config.api_enabled:
+            from api_server import serve_api_server
+            tasks.append(asyncio.ensure_future(serve_api_server(self, self.config)))
+        
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                task.result()  # 传播 API 服务器的异常（如端口被占用）
+        finally:
+            self._loop = None
+            self._stop_event = None
+        
     def run_forever(self):
         """运行主循环"""
         self.start()
         
         try:
-            # 如果启用 API，启动 API 服务器
             if self.config.api_enabled:
-                from api_server import run_api_server
-                run_api_server(self, self.config)
+                from api_server import run_event_loop
+                run_event_loop(self._main())
             else:
-                # 否则只是等待
-                while self._is_running:
-                    time.sleep(0.1)
+                asyncio.run(self._main())
         except KeyboardInterrupt:
             logger.info("\n收到退出信号...")
         finally:
             self.stop()
 
 
+def _wait_killed(procs: list, timeout: float = 1.0):
+    """等待被终止的进程真正退出（其占用的端口随之释放）"""
+    import psutil
+    
+    if procs:
+        psutil.wait_procs(procs, timeout=timeout)
+
+
 def kill_existing_process(port: int) -> bool:
     """终止占用指定端口的进程"""
-    import subprocess
+    import psutil
     
+    killed = []
+    current_pid = os.getpid()
     try:
-        # 查找占用端口的进程
-        result = subprocess.run(
-            ['lsof', '-ti', f':{port}'],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.stdout.strip():
-            pids = result.stdout.strip().split('\n')
-            for pid in pids:
-                if pid:
-                    try:
-                        subprocess.run(['kill', '-9', pid], check=True)
-                        logger.info(f"已终止占用端口 {port} 的进程 (PID: {pid})")
-                    except:
-                        pass
-            return True
+        for proc in psutil.process_iter(['pid']):
+            if proc.pid == current_pid:
+                continue
+            try:
+                conns = proc.net_connections(kind='inet')
+                if any(c.laddr and c.laddr.port == port for c in conns):
+                    proc.kill()
+                    killed.append(proc)
+                    logger.info(f"已终止占用端口 {port} 的进程 (PID: {proc.pid})")
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
     except Exception as e:
         logger.warning(f"检查端口占用失败: {e}")
     
-    return False
+    _wait_killed(killed)
+    return bool(killed)
 
 
 def kill_existing_funasr_processes():
     """终止之前运行的 FunASR Live 进程"""
-    import subprocess
+    import psutil
     
+    killed = []
+    current_pid = os.getpid()
     try:
-        # 查找 funasr_live.py 进程
-        result = subprocess.run(
-            ['pgrep', '-f', 'funasr_live.py'],
-            capture_output=True,
-            text=True
-        )
-        
-        current_pid = str(os.getpid())
-        
-        if result.stdout.strip():
-            pids = result.stdout.strip().split('\n')
-            for pid in pids:
-                if pid and pid != current_pid:
-                    try:
-                        subprocess.run(['kill', '-9', pid], check=True)
-                        logger.info(f"已终止之前的 FunASR Live 进程 (PID: {pid})")
-                    except:
-                        pass
+        for proc in psutil.process_iter(['pid', 'cmdline']):
+            cmdline = proc.info['cmdline'] or []
+            if proc.pid == current_pid or not any('funasr_live.py' in arg for arg in cmdline):
+                continue
+            try:
+                proc.kill()
+                killed.append(proc)
+                logger.info(f"已终止之前的 FunASR Live 进程 (PID: {proc.pid})")
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
     except Exception as e:
         logger.warning(f"检查进程失败: {e}")
+    
+    _wait_killed(killed)
 
 
 def main():
@@ -808,9 +1024,6 @@ def main():
             # 默认端口
             kill_existing_process(8765)
         
-        # 等待端口释放
-        time.sleep(0.5)
-        
     # 加载配置
     config_path = args.config if os.path.exists(args.config) else None
     
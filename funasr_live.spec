@@ -41,6 +41,7 @@ if sys.platform == 'darwin':
         'pynput.keyboard._darwin',
         'AppKit',
         'Foundation',
+        'Quartz',
     ])
 elif sys.platform == 'win32':
     hiddenimports.extend([
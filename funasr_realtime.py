@@ -11,6 +11,9 @@ FunASR 实时连续语音识别
 4. 实时输入 - 边说边输入到当前应用
 """
 
+import contextlib
+import copy
+import functools
 import logging
 import os
 import queue
@@ -18,16 +21,36 @@ import subprocess
 import sys
 import threading
 import time
-from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Callable
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import sounddevice as sd
 import torch
 import yaml
 
+try:
+    # 可选: Numba 编译音频回调中的 VAD 判定
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    # macOS: 进程内写剪贴板（NSPasteboard）并直接投递 Cmd+V 键盘事件（Quartz），
+    # 不必每次输出都启动 pbcopy/osascript 进程
+    from AppKit import NSPasteboard, NSPasteboardTypeString
+    import Quartz
+except ImportError:
+    NSPasteboard = None
+    Quartz = None
+
+try:
+    # 可选: Aho-Corasick 自动机，一次扫描匹配全部唤醒词/休眠词
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +58,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger("FunASR-Realtime")
 
+# ========== 配置文件 ==========
+# 优先使用 libyaml 的 C 实现解析/写出配置，纯 Python 实现慢一个数量级
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_yaml(path: str, mtime: float) -> dict:
+    """解析 YAML 文件；以 (路径, 修改时间) 为键缓存，文件改动后自动重新解析"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+# int16 采样转换为 [-1, 1] float32 的缩放系数
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+# ========== 设备探测 ==========
+@functools.lru_cache(maxsize=None)
+def _detect_device() -> str:
+    """探测推理设备（进程内只探测一次）"""
+    if torch.cuda.is_available():
+        return "cuda:0"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+@functools.lru_cache(maxsize=None)
+def _query_audio_devices() -> tuple:
+    """枚举音频设备（进程内只枚举一次，识别器重建时复用）"""
+    return tuple(sd.query_devices())
+
+
+# ========== 剪贴板与粘贴 ==========
+_KEYCODE_V = 9  # ANSI 键盘上 V 键的虚拟键码
+
+
+def _set_clipboard(text: str):
+    """写入剪贴板：优先 NSPasteboard（同步完成），不可用时回退到 pbcopy"""
+    if NSPasteboard is not None:
+        pasteboard = NSPasteboard.generalPasteboard()
+        pasteboard.clearContents()
+        pasteboard.setString_forType_(text, NSPasteboardTypeString)
+        return
+    process = subprocess.Popen(
+        ['pbcopy'],
+        stdin=subprocess.PIPE,
+        env={'LANG': 'en_US.UTF-8'}
+    )
+    process.communicate(text.encode('utf-8'))
+
+
+def _paste():
+    """模拟 Cmd+V：优先直接投递 Quartz 键盘事件，不可用时回退到 osascript"""
+    if Quartz is not None:
+        source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+        for key_down in (True, False):
+            event = Quartz.CGEventCreateKeyboardEvent(source, _KEYCODE_V, key_down)
+            Quartz.CGEventSetFlags(event, Quartz.kCGEventFlagMaskCommand)
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+        return
+    script = '''
+    tell application "System Events"
+        keystroke "v" using command down
+    end tell
+    '''
+    subprocess.run(['osascript', '-e', script], check=True,
+                   capture_output=True, timeout=5)
+
+
+# ========== VAD 判定 ==========
+# 每个音频块的判定结果
+VAD_VOICE = 0    # 有语音
+VAD_SILENCE = 1  # 静音
+VAD_END = 2      # 静音持续时间已超过上限
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _vad_step(block, threshold, state, silence_limit):
+        """
+        对一个 int16 音频块做音量判定并更新计数器
+        
+        state: int64 数组 [silence_frames, voice_frames, peak_volume]
+        """
+        total = 0
+        for i in range(block.shape[0]):
+            # 先扩宽到 int64 再取绝对值，-32768 不会溢出
+            v = np.int64(block[i])
+            total += v if v >= 0 else -v
+        if total > threshold * block.shape[0]:
+            state[0] = 0
+            state[1] += 1
+            volume = total // block.shape[0]
+            if volume > state[2]:
+                state[2] = volume
+            return VAD_VOICE
+        state[0] += 1
+        if state[0] > silence_limit:
+            return VAD_END
+        return VAD_SILENCE
+else:
+    _vad_step = None
+
 
 @dataclass
 class RealtimeConfig:
@@ -42,6 +168,7 @@ class RealtimeConfig:
     # 模型配置
     model_name: str = "FunAudioLLM/Fun-ASR-Nano-2512"
     model_hub: str = "ms"
+    precision: str = "bf16"  # bf16, fp16, fp32, int8；bf16/fp16 仅在 GPU 上生效，int8 为 CPU 动态量化
     
     # 音频配置
     sample_rate: int = 16000
@@ -80,8 +207,8 @@ class RealtimeConfig:
         if not os.path.exists(path):
             return cls()
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f) or {}
+            # 缓存的字典是共享的，深拷贝后再交给 RealtimeConfig，避免唤醒词等列表被改动
+            data = copy.deepcopy(_load_yaml(path, os.path.getmtime(path)))
             return cls(**{k: v for k, v in data.items() if hasattr(cls, k)})
         except Exception as e:
             logger.error(f"加载配置失败: {e}")
@@ -91,6 +218,7 @@ class RealtimeConfig:
         data = {
             'model_name': self.model_name,
             'model_hub': self.model_hub,
+            'precision': self.precision,
             'sample_rate': self.sample_rate,
             'channels': self.channels,
             'audio_device': self.audio_device,
@@ -111,7 +239,44 @@ class RealtimeConfig:
             'api_port': self.api_port,
         }
         with open(path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
+            yaml.dump(data, f, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)
+
+
+class KeywordMatcher:
+    """
+    多关键词匹配器
+    
+    安装了 pyahocorasick 时构建 Aho-Corasick 自动机，一次扫描文本即可匹配全部关键词；
+    否则逐个关键词做子串查找。
+    """
+    
+    def __init__(self, keywords: Dict[str, List[str]]):
+        # 类别 -> 关键词列表，如 {"wake": [...], "sleep": [...]}
+        self._keywords = {kind: [w for w in words if w] for kind, words in keywords.items()}
+        self._automaton = None
+        if ahocorasick is not None and any(self._keywords.values()):
+            # 同一个词可能属于多个类别，值中记录它所属的全部类别
+            kinds_by_word: Dict[str, Tuple[str, ...]] = {}
+            for kind, words in self._keywords.items():
+                for word in words:
+                    kinds_by_word[word] = kinds_by_word.get(word, ()) + (kind,)
+            automaton = ahocorasick.Automaton()
+            for word, kinds in kinds_by_word.items():
+                automaton.add_word(word, (word, kinds))
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def find(self, text: str, kind: str) -> Optional[str]:
+        """返回 text 中出现的第一个 kind 类关键词，没有则返回 None"""
+        if self._automaton is not None:
+            for _, (word, kinds) in self._automaton.iter(text):
+                if kind in kinds:
+                    return word
+            return None
+        for word in self._keywords.get(kind, ()):
+            if word in text:
+                return word
+        return None
 
 
 class HotkeyManager:
@@ -179,10 +344,7 @@ class HotkeyManager:
                     logger.error(f"快捷键回调错误: {e}")
     
     def _on_release(self, key):
-        try:
-            self._current_keys.discard(key)
-        except:
-            pass
+        self._current_keys.discard(key)
     
     def start(self):
         """启动监听"""
@@ -204,11 +366,22 @@ class HotkeyManager:
 class ASREngine:
     """语音识别引擎"""
     
+    _DTYPE_MAP = {"fp16": torch.float16, "bf16": torch.bfloat16, "fp32": torch.float32}
+    
     def __init__(self, config: RealtimeConfig):
         self.config = config
         self.model = None
         self.device = None
         self._initialized = False
+        # 同一监听会话内跨语音段复用的 FunASR cache；共享状态，推理需串行
+        # （唤醒词检测在音频处理线程，语音段识别在识别线程）。
+        # 重置时整体换成新字典而不是加锁清空，控制路径不必等待正在进行的推理
+        self._cache: dict = {}
+        self._infer_lock = threading.Lock()
+        # 实际生效的精度（设备不支持 bf16 时回退 fp16，CPU 上为 int8 或 fp32）
+        self._precision = "fp32"
+        # 权重已转换为半精度时传给 generate 的标志（fp16=True / bf16=True）
+        self._dtype_kwargs: Dict[str, bool] = {}
         
     def initialize(self):
         if self._initialized:
@@ -217,12 +390,7 @@ class ASREngine:
         logger.info("正在初始化 FunASR 模型...")
         
         # 确定设备
-        if torch.cuda.is_available():
-            self.device = "cuda:0"
-        elif torch.backends.mps.is_available():
-            self.device = "mps"
-        else:
-            self.device = "cpu"
+        self.device = _detect_device()
             
         logger.info(f"使用设备: {self.device}")
         
@@ -238,31 +406,84 @@ class ASREngine:
             vad_kwargs={"max_single_segment_time": 30000},
             disable_update=True,
         )
+        self.model.model.eval()
+        self._convert_weights()
         
         self._initialized = True
         logger.info("模型初始化完成！")
         
+    def _convert_weights(self):
+        """按 config.precision 转换权重：GPU 上转为 bf16/fp16（LayerNorm 保持 fp32），precision 为 int8 时在 CPU 上对 Linear 做动态量化"""
+        precision = self.config.precision
+        model = self.model.model
+        
+        if precision == "int8":
+            if self.device != "cpu":
+                logger.warning(f"int8 动态量化仅支持 CPU，当前设备 {self.device} 保持 fp32")
+                return
+            torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            self._precision = "int8"
+            logger.info("模型 Linear 层已量化为 int8")
+            return
+        
+        # CPU 上半精度没有收益，保持 fp32
+        if precision not in self._DTYPE_MAP or precision == "fp32" or self.device == "cpu":
+            return
+        
+        if precision == "bf16" and not self._bf16_supported():
+            logger.warning(f"当前设备 {self.device} 不支持 bf16，改用 fp16")
+            precision = "fp16"
+        model.to(self._DTYPE_MAP[precision])
+        for module in model.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()
+        # 告知 model.py 输入特征与 LLM 使用同一精度，否则它会在每次推理时把 LLM 转回 fp32
+        self._precision = precision
+        self._dtype_kwargs = {precision: True}
+        logger.info(f"模型权重已转换为 {precision}")
+        
+    def _bf16_supported(self) -> bool:
+        """检查当前设备是否支持 bf16（MPS 需 macOS 14+，旧版本上创建 bf16 张量会报错）"""
+        if self.device.startswith("cuda"):
+            return torch.cuda.is_bf16_supported()
+        try:
+            torch.ones(1, dtype=torch.bfloat16, device=self.device) + 1
+        except (RuntimeError, TypeError):
+            return False
+        return True
+        
+    def _autocast(self):
+        """按实际精度构造混合精度上下文（CPU 或 fp32 时不启用）"""
+        dtype = self._DTYPE_MAP.get(self._precision)
+        if dtype is None or dtype is torch.float32:
+            return contextlib.nullcontext()
+        device_type = "cuda" if self.device.startswith("cuda") else self.device
+        return torch.autocast(device_type, dtype=dtype)
+        
     def recognize(self, audio_data: np.ndarray) -> str:
         if not self._initialized:
             self.initialize()
             
+        # 调用方负责提供 [-1, 1] 的 float32（见 RealtimeRecognizer._segment_audio）
+        # 类型不符是调用方错误：在 try 之外显式抛出，不受 -O 影响，也不会被当作识别失败而重置 cache
+        if audio_data.dtype != np.float32:
+            raise TypeError(f"音频数据应为 float32，实际为 {audio_data.dtype}")
+        
         try:
-            if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32)
-            
-            if np.abs(audio_data).max() > 1.0:
-                audio_data = audio_data / 32768.0
-                
+            # 保持在 CPU 上：FunASR 在 CPU 上做 VAD 与 fbank 特征提取，之后才把特征送到模型设备；
+            # _segment_audio 返回的是新分配的连续数组，from_numpy 直接共享内存不再复制
             audio_tensor = torch.from_numpy(audio_data)
             
-            result = self.model.generate(
-                input=[audio_tensor],
-                cache={},
-                batch_size=1,
-                hotwords=self.config.hotwords,
-                language=self.config.language,
-                itn=True,
-            )
+            with self._infer_lock, torch.inference_mode(), self._autocast():
+                result = self.model.generate(
+                    input=[audio_tensor],
+                    cache=self._cache,
+                    batch_size=1,
+                    hotwords=self.config.hotwords,
+                    language=self.config.language,
+                    itn=True,
+                    **self._dtype_kwargs,
+                )
             
             if result and len(result) > 0:
                 text = result[0].get("text", "")
@@ -271,29 +492,55 @@ class ASREngine:
             
         except Exception as e:
             logger.error(f"识别错误: {e}")
+            # 出错时 cache 可能残留半途状态
+            self.reset_cache()
             return ""
+            
+    def reset_cache(self):
+        """清空跨语音段复用的 cache（结束监听会话时调用）；不获取推理锁，可在事件循环、GUI、热键线程直接调用。
+        
+        正在进行的推理仍写入旧字典，随后被丢弃；下一次 generate 读取到的是新的空字典。
+        """
+        self._cache = {}
 
 
 class RealtimeRecognizer:
     """实时连续语音识别器"""
     
+    _OUTPUT_QUEUE_SIZE = 16
+    
     def __init__(self, config: RealtimeConfig):
         self.config = config
         self.asr_engine = ASREngine(config)
         self.hotkey_manager = HotkeyManager()
+        self._keywords = KeywordMatcher({
+            "wake": config.wake_words,
+            "sleep": config.sleep_words,
+        })
         
         # 状态
         self.is_running = False
         self.is_listening = False  # 是否在监听（唤醒后）
         self.is_recording = False  # 是否在录音（检测到语音）
         
-        # 音频缓冲
-        self.audio_buffer = deque(maxlen=int(config.sample_rate * config.max_record_duration))
-        self.current_segment = []  # 当前语音段
+        # 音频缓冲：预分配 int16 环形缓冲区，音频回调只做切片赋值，识别时再转换为 float32
+        self._ring = np.zeros(int(config.sample_rate * config.max_record_duration), dtype=np.int16)
+        self._write_idx = 0  # 累计写入的采样数
+        # 当前语音段在环形缓冲区中的范围 [start, end)（以累计采样数表示），None 表示没有语音段
+        self._seg_start: Optional[int] = None
+        self._seg_end = 0
         
-        # 静音检测
-        self.silence_frames = 0
-        self.voice_frames = 0
+        # 静音检测：音量直接在 int16 上计算，阈值换算到 int16 量程
+        self._vad_state = np.zeros(3, dtype=np.int64)  # [silence_frames, voice_frames, peak_volume]
+        self._blocksize = int(config.sample_rate * 0.1)  # 100ms 块
+        self._volume_threshold = config.silence_threshold * 32768
+        # 语音段峰值音量低于此值（2 倍静音阈值）时视为背景噪声，不送识别
+        self._min_peak_volume = 2 * self._volume_threshold
+        # 取绝对值的缓冲区用 int32：int16 的 -32768 取绝对值会溢出回 -32768
+        self._abs_scratch = np.empty(self._blocksize, dtype=np.int32)
+        # 每块都要用到的判定参数，按块数/采样数预先算好
+        self._silence_block_limit = max(1, int(config.silence_duration * config.sample_rate / self._blocksize))
+        self._min_samples = int(config.sample_rate * config.min_record_duration)
         
         # 回调
         self.on_result: Optional[Callable[[str], None]] = None
@@ -305,11 +552,17 @@ class RealtimeRecognizer:
         
         # 线程
         self._stream = None
-        self._process_thread = None
+        self._process_thread: Optional[threading.Thread] = None  # 常驻识别线程
+        self._vad_thread: Optional[threading.Thread] = None      # 音频处理（VAD）线程
+        # 待识别的语音段；每次 start() 换新队列，上一轮的识别线程只消费自己的队列
+        self._segment_queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        # 停止信号；同样每次 start() 换新，上一轮的线程只看得到自己那一轮的信号
         self._stop_event = threading.Event()
         
-        # 待输出队列 - 用于跨线程传递输出文本
-        self._output_queue = queue.Queue()
+        # 待输出队列 - 用于跨线程传递输出文本，入队时置位事件唤醒主线程；
+        # 有界，主线程卡住时丢弃最旧的文本，避免无限堆积
+        self._output_queue: "queue.Queue[str]" = queue.Queue(maxsize=self._OUTPUT_QUEUE_SIZE)
+        self._output_event = threading.Event()
         
         # 输入设备
         self._input_device = self._get_input_device()
@@ -336,130 +589,261 @@ class RealtimeRecognizer:
     
     def _on_hotkey_force(self):
         """快捷键：强制输出当前内容"""
-        if self.is_listening and self.current_segment:
+        if self.is_listening and self._has_segment():
             logger.info("⚡ 强制输出当前内容")
             self.force_process()
         
     def _get_input_device(self) -> Optional[int]:
         """获取输入设备"""
+        try:
+            devices = _query_audio_devices()
+        except Exception as e:
+            logger.error(f"枚举音频设备失败: {e}")
+            devices = ()
+        
         if self.config.audio_device is not None:
             try:
-                info = sd.query_devices(self.config.audio_device)
+                info = devices[self.config.audio_device]
+            except (IndexError, TypeError):
+                logger.warning(f"配置的音频设备不存在: {self.config.audio_device}")
+            else:
                 if info['max_input_channels'] > 0:
                     logger.info(f"使用音频设备: [{self.config.audio_device}] {info['name']}")
                     return self.config.audio_device
-            except:
-                pass
         
         # 查找可用的输入设备
-        try:
-            devices = sd.query_devices()
-            for i, dev in enumerate(devices):
-                if dev['max_input_channels'] > 0:
-                    logger.info(f"使用音频设备: [{i}] {dev['name']}")
-                    return i
-        except:
-            pass
+        for i, dev in enumerate(devices):
+            if dev['max_input_channels'] > 0:
+                logger.info(f"使用音频设备: [{i}] {dev['name']}")
+                return i
         
         logger.error("未找到可用的音频输入设备！")
         return None
     
-    def _audio_callback(self, indata, frames, time_info, status):
-        """音频回调"""
-        if status:
-            logger.warning(f"音频状态: {status}")
+    def _has_segment(self) -> bool:
+        """当前是否有未处理的语音段"""
+        return self._seg_start is not None and self._seg_end > self._seg_start
+    
+    def _segment_length(self) -> int:
+        """当前语音段的采样数"""
+        if self._seg_start is None:
+            return 0
+        return self._seg_end - self._seg_start
+    
+    def _extend_segment(self, block_start: int, block_end: int):
+        """把音频块 [block_start, block_end) 并入当前语音段"""
+        if self._seg_start is None:
+            self._seg_start = block_start
+        self._seg_end = block_end
+    
+    def _reset_segment(self):
+        """丢弃当前语音段"""
+        self._seg_start = None
+        self._seg_end = 0
+        self._vad_state[2] = 0
+    
+    def _segment_audio(self) -> np.ndarray:
+        """
+        取出当前语音段，转换为 [-1, 1] 的 float32
         
-        audio = indata.flatten()
-        volume = np.abs(audio).mean()
+        类型转换与缩放在一次 np.multiply 中完成，结果是新数组（识别在后台进行，
+        期间环形缓冲区会继续被写入）。
+        """
+        length = self._segment_length()
+        if length <= 0:
+            return np.empty(0, dtype=np.float32)
+        capacity = len(self._ring)
+        if length > capacity:
+            logger.warning(f"语音段超过 {self.config.max_record_duration}s 上限，仅保留最新部分")
+            length = capacity
+        start = (self._seg_end - length) % capacity
+        first = min(length, capacity - start)
+        audio = np.empty(length, dtype=np.float32)
+        np.multiply(self._ring[start:start + first], _INT16_SCALE, out=audio[:first])
+        if first < length:
+            np.multiply(self._ring[:length - first], _INT16_SCALE, out=audio[first:])
+        return audio
+    
+    def _make_audio_callback(self) -> Callable:
+        """
+        构造音频回调（PortAudio 实时线程）：只把采样写入环形缓冲区，写满后覆盖最旧的数据，
+        VAD 与识别交给处理线程
         
-        # 添加到缓冲区
-        self.audio_buffer.extend(audio)
+        环形缓冲区与容量预先绑定为闭包变量，回调中不再逐次查找属性。
+        """
+        ring = self._ring
+        capacity = len(ring)
+        warn = logger.warning
         
-        # 如果启用唤醒词且未激活，只监听唤醒词
-        if self.config.wake_word_enabled and not self.is_listening:
-            # 检测是否有语音（用于唤醒词检测）
-            if volume > self.config.silence_threshold:
-                self.current_segment.extend(audio)
-                self.voice_frames += 1
-                self.silence_frames = 0
+        def audio_callback(indata, frames, time_info, status):
+            if status:
+                warn(f"音频状态: {status}")
+            pos = self._write_idx % capacity
+            first = capacity - pos
+            if frames <= first:
+                ring[pos:pos + frames] = indata[:, 0]
             else:
-                self.silence_frames += 1
-                if self.silence_frames > int(self.config.silence_duration * self.config.sample_rate / len(audio)):
-                    if len(self.current_segment) > self.config.sample_rate * self.config.min_record_duration:
-                        # 检查唤醒词
-                        self._check_wake_word()
-                    self.current_segment = []
-                    self.voice_frames = 0
-            return
+                ring[pos:] = indata[:first, 0]
+                ring[:frames - first] = indata[first:, 0]
+            self._write_idx += frames
+        
+        return audio_callback
+    
+    def _vad_loop(self, stop_event: threading.Event):
+        """
+        处理线程：消费环形缓冲区中的新音频块
         
-        # 正在监听状态
+        单生产者（音频回调）单消费者（本线程）：回调先写采样再推进 _write_idx，
+        本线程只读到 _write_idx 为止，二者之间无需加锁。
+        """
+        ring = self._ring
+        capacity = len(ring)
+        blocksize = self._blocksize
+        wait = stop_event.wait
+        stopped = stop_event.is_set
+        read_idx = self._write_idx
+        # 模式在启动时已确定，直接选定对应的处理函数，不必每块再判断
+        process_block = self._process_block_wake if self.config.wake_word_enabled else self._process_block_listen
+        while not wait(0.02):
+            write_idx = self._write_idx
+            if write_idx - read_idx > capacity:
+                logger.warning("音频处理跟不上采集速度，丢弃过旧的音频")
+                read_idx = write_idx - capacity + blocksize
+            while write_idx - read_idx >= blocksize:
+                if stopped():
+                    return
+                start = read_idx % capacity
+                end = start + blocksize
+                if end <= capacity:
+                    block = ring[start:end]
+                else:
+                    block = np.concatenate((ring[start:], ring[:end - capacity]))
+                try:
+                    process_block(block, read_idx)
+                except Exception as e:
+                    logger.error(f"音频处理错误: {e}")
+                read_idx += blocksize
+    
+    def _process_block_listen(self, audio: np.ndarray, block_start: int):
+        """连续识别模式（未启用唤醒词）：对一个音频块做 VAD 判定，监听时维护当前语音段"""
+        vad = self._vad(audio, self._silence_block_limit)
         if self.is_listening:
-            if volume > self.config.silence_threshold:
-                # 检测到语音
-                if not self.is_recording:
-                    self.is_recording = True
-                    self._notify_status("recording")
-                    logger.info("🎤 检测到语音，开始录音...")
-                
-                self.current_segment.extend(audio)
-                self.voice_frames += 1
-                self.silence_frames = 0
-            else:
-                # 静音
-                self.silence_frames += 1
-                
-                if self.is_recording:
-                    self.current_segment.extend(audio)  # 继续录制静音部分
-                    
-                    # 检查是否静音足够长
-                    silence_samples = int(self.config.silence_duration * self.config.sample_rate / len(audio))
-                    if self.silence_frames > silence_samples:
-                        # 静音足够长，处理当前段
-                        if len(self.current_segment) > self.config.sample_rate * self.config.min_record_duration:
-                            self._process_segment()
-                        self.current_segment = []
-                        self.voice_frames = 0
-                        self.is_recording = False
-                        self._notify_status("listening")
+            self._record_block(vad, block_start, block_start + len(audio))
+    
+    def _process_block_wake(self, audio: np.ndarray, block_start: int):
+        """唤醒词模式：未激活时只收集语音段检测唤醒词，激活后与连续识别模式相同"""
+        block_end = block_start + len(audio)
+        vad = self._vad(audio, self._silence_block_limit)
+        
+        if self.is_listening:
+            self._record_block(vad, block_start, block_end)
+            return
+        
+        # 检测是否有语音（用于唤醒词检测）
+        if vad == VAD_VOICE:
+            self._extend_segment(block_start, block_end)
+        elif vad == VAD_END:
+            if self._segment_length() > self._min_samples:
+                # 检查唤醒词
+                self._check_wake_word()
+            self._reset_segment()
+            self._vad_state[1] = 0
+    
+    def _record_block(self, vad: int, block_start: int, block_end: int):
+        """监听状态下按 VAD 结果录制语音段，静音足够长时提交识别"""
+        if vad == VAD_VOICE:
+            # 检测到语音
+            if not self.is_recording:
+                self.is_recording = True
+                self._notify_status("recording")
+                logger.info("🎤 检测到语音，开始录音...")
+            
+            self._extend_segment(block_start, block_end)
+        elif self.is_recording:
+            # 静音，继续录制静音部分
+            self._extend_segment(block_start, block_end)
+            
+            # 静音足够长，处理当前段
+            if vad == VAD_END:
+                if self._segment_length() > self._min_samples:
+                    self._process_segment()
+                self._reset_segment()
+                self._vad_state[1] = 0
+                self.is_recording = False
+                self._notify_status("listening")
+    
+    def _vad(self, audio: np.ndarray, silence_limit: int) -> int:
+        """音量判定，返回 VAD_VOICE / VAD_SILENCE / VAD_END"""
+        if _vad_step is not None:
+            return _vad_step(audio, self._volume_threshold, self._vad_state, silence_limit)
+        
+        n = len(audio)
+        if n > len(self._abs_scratch):
+            self._abs_scratch = np.empty(n, dtype=np.int32)
+        state = self._vad_state
+        volume = np.abs(audio, out=self._abs_scratch[:n], dtype=np.int32).mean()
+        if volume > self._volume_threshold:
+            state[0] = 0
+            state[1] += 1
+            state[2] = max(state[2], int(volume))
+            return VAD_VOICE
+        state[0] += 1
+        return VAD_END if state[0] > silence_limit else VAD_SILENCE
+    
+    def _is_background_noise(self) -> bool:
+        """当前语音段的峰值音量从未超过门限（呼吸、风扇等触发的 VAD），无需识别"""
+        return self._vad_state[2] < self._min_peak_volume
     
     def _check_wake_word(self):
         """检查唤醒词"""
-        if not self.current_segment:
+        if not self._has_segment() or self._is_background_noise():
             return
         
-        audio_data = np.array(self.current_segment, dtype=np.float32)
+        audio_data = self._segment_audio()
         text = self.asr_engine.recognize(audio_data)
         
         if text:
             logger.info(f"检测到语音: {text}")
             
             # 检查是否包含唤醒词
-            for wake_word in self.config.wake_words:
-                if wake_word in text:
-                    logger.info(f"🔔 唤醒词触发: {wake_word}")
-                    self.is_listening = True
-                    self._notify_status("listening")
-                    return
+            wake_word = self._keywords.find(text, "wake")
+            if wake_word is not None:
+                logger.info(f"🔔 唤醒词触发: {wake_word}")
+                self.is_listening = True
+                self._notify_status("listening")
+                return
     
     def _process_segment(self):
-        """处理语音段"""
-        if not self.current_segment:
+        """处理语音段：交给识别线程，音频回调不等待识别"""
+        if not self._has_segment():
+            return
+        if self._is_background_noise():
+            logger.info("🔇 语音段音量过低，跳过识别")
             return
         
-        audio_data = np.array(self.current_segment, dtype=np.float32)
-        
-        # 在后台线程中识别
-        def recognize():
+        self._segment_queue.put(self._segment_audio())
+    
+    def _process_loop(self, segments: "queue.Queue[Optional[np.ndarray]]", stop_event: threading.Event):
+        """识别线程主循环：按顺序识别本轮队列中的语音段，收到 None 时退出"""
+        while True:
+            audio_data = segments.get()
+            if audio_data is None:
+                break
+            
             text = self.asr_engine.recognize(audio_data)
+            if stop_event.is_set():
+                # 识别期间已停止：丢弃结果，不在下一轮输出
+                continue
             
             if text:
                 # 检查是否是休眠词
-                for sleep_word in self.config.sleep_words:
-                    if sleep_word in text:
-                        logger.info(f"💤 休眠词触发: {sleep_word}")
-                        self.is_listening = False
-                        self._notify_status("sleeping")
-                        return
+                sleep_word = self._keywords.find(text, "sleep")
+                if sleep_word is not None:
+                    logger.info(f"💤 休眠词触发: {sleep_word}")
+                    self.is_listening = False
+                    self.asr_engine.reset_cache()
+                    self._notify_status("sleeping")
+                    continue
                 
                 logger.info(f"✅ 识别结果: {text}")
                 self._output_text(text)
@@ -468,8 +852,6 @@ class RealtimeRecognizer:
                     self.on_result(text)
             else:
                 logger.info("⚠️ 未识别到有效内容")
-        
-        threading.Thread(target=recognize, daemon=True).start()
     
     def _output_text(self, text: str):
         """输出文本 - 将文本放入队列，由主线程处理"""
@@ -482,7 +864,24 @@ class RealtimeRecognizer:
             return
         
         # 否则放入队列，由 process_pending_outputs 处理
-        self._output_queue.put(text)
+        while True:
+            try:
+                self._output_queue.put_nowait(text)
+                break
+            except queue.Full:
+                try:
+                    dropped = self._output_queue.get_nowait()
+                    logger.warning(f"输出队列已满，丢弃: {dropped[:30]}...")
+                except queue.Empty:
+                    pass
+        self._output_event.set()
+    
+    def wait_for_output(self, timeout: Optional[float] = None) -> bool:
+        """等待有新的待输出文本（或停止），超时返回 False"""
+        if self._output_event.wait(timeout):
+            self._output_event.clear()
+            return True
+        return False
     
     def process_pending_outputs(self):
         """处理待输出队列 - 必须在主线程中调用"""
@@ -500,46 +899,29 @@ class RealtimeRecognizer:
         
         mode = self.config.output_mode
         
+        copied = False
         if mode in ("clipboard", "both"):
-            self._copy_to_clipboard(text)
+            copied = self._copy_to_clipboard(text)
         
         if mode in ("type", "both"):
-            self._type_text(text)
+            self._type_text(text, copied=copied)
     
-    def _copy_to_clipboard(self, text: str):
+    def _copy_to_clipboard(self, text: str) -> bool:
         """复制到剪贴板"""
         try:
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
+            _set_clipboard(text)
             logger.info(f"📋 已复制: {text[:30]}...")
+            return True
         except Exception as e:
             logger.error(f"复制失败: {e}")
+            return False
     
-    def _type_text(self, text: str):
-        """模拟输入"""
+    def _type_text(self, text: str, copied: bool = False):
+        """模拟输入：剪贴板 + Cmd+V（已复制过时不再重复写剪贴板）"""
         try:
-            # 先复制到剪贴板
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
-            
-            time.sleep(0.05)
-            
-            # 模拟 Cmd+V
-            script = '''
-            tell application "System Events"
-                keystroke "v" using command down
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', script], check=True, 
-                         capture_output=True, timeout=5)
+            if not copied:
+                _set_clipboard(text)
+            _paste()
             logger.info(f"⌨️ 已输入: {text[:30]}...")
         except Exception as e:
             logger.error(f"输入失败: {e}")
@@ -572,8 +954,28 @@ class RealtimeRecognizer:
         # 初始化模型
         self.asr_engine.initialize()
         
+        # 预编译 VAD 内核，避免首个音频回调里触发 JIT 编译
+        if _vad_step is not None:
+            _vad_step(np.zeros(self._blocksize, dtype=np.int16), self._volume_threshold,
+                      np.zeros(3, dtype=np.int64), 1)
+        
+        # 上一轮的音频处理线程已收到停止信号，最多还在处理一个块（唤醒词模式下可能正在识别）；
+        # 等它退出，保证环形缓冲区与语音段状态始终只有一个消费者
+        if self._vad_thread is not None:
+            self._vad_thread.join()
+            self._vad_thread = None
+        
         self.is_running = True
-        self._stop_event.clear()
+        stop_event = self._stop_event = threading.Event()
+        
+        # 启动识别线程与音频处理线程
+        self._segment_queue = queue.Queue()
+        self._process_thread = threading.Thread(
+            target=self._process_loop, args=(self._segment_queue, stop_event), daemon=True
+        )
+        self._process_thread.start()
+        self._vad_thread = threading.Thread(target=self._vad_loop, args=(stop_event,), daemon=True)
+        self._vad_thread.start()
         
         # 启动快捷键监听（如果启用）
         if enable_hotkeys and self.config.hotkey_toggle and self.config.hotkey_force:
@@ -600,9 +1002,9 @@ class RealtimeRecognizer:
             device=self._input_device,
             samplerate=self.config.sample_rate,
             channels=self.config.channels,
-            dtype='float32',
-            callback=self._audio_callback,
-            blocksize=int(self.config.sample_rate * 0.1)  # 100ms 块
+            dtype='int16',
+            callback=self._make_audio_callback(),
+            blocksize=self._blocksize
         )
         self._stream.start()
     
@@ -621,6 +1023,7 @@ class RealtimeRecognizer:
         self.is_listening = False
         self.is_recording = False
         self._stop_event.set()
+        self._output_event.set()  # 唤醒等待输出的主线程
         
         # 停止快捷键监听
         self.hotkey_manager.stop()
@@ -630,6 +1033,18 @@ class RealtimeRecognizer:
             self._stream.close()
             self._stream = None
         
+        # 丢弃尚未识别的语音段并通知识别线程退出（音频处理线程随 _stop_event 退出）；
+        # 队列只属于本轮，快速重启时新线程不会取到这个 None，也不会输出上一轮的语音段
+        segments = self._segment_queue
+        while True:
+            try:
+                segments.get_nowait()
+            except queue.Empty:
+                break
+        segments.put(None)
+        self._process_thread = None
+        # 保留 _vad_thread，下次 start() 时等它退出后再启动新线程
+        
         logger.info("已停止")
     
     def toggle_listening(self):
@@ -637,6 +1052,7 @@ class RealtimeRecognizer:
         if self.is_listening:
             self.is_listening = False
             self.is_recording = False
+            self.asr_engine.reset_cache()
             self._notify_status("sleeping")
         else:
             self.is_listening = True
@@ -644,9 +1060,9 @@ class RealtimeRecognizer:
     
     def force_process(self):
         """强制处理当前缓冲区"""
-        if self.current_segment:
+        if self._has_segment():
             self._process_segment()
-            self.current_segment = []
+            self._reset_segment()
             self.is_recording = False
 
 
@@ -665,8 +1081,9 @@ def kill_existing_processes(port: int):
                     subprocess.run(['kill', '-9', pid], capture_output=True)
         
         time.sleep(0.5)
-    except:
-        pass
+    except OSError as e:
+        # pkill / lsof 不可用
+        logger.warning(f"清理旧进程失败: {e}")
 
 
 def main():
@@ -722,9 +1139,9 @@ def main():
     try:
         logger.info("\n按 Ctrl+C 退出\n")
         while recognizer.is_running:
-            # 在主线程中处理待输出队列
-            recognizer.process_pending_outputs()
-            time.sleep(0.05)
+            # 在主线程中处理待输出队列（有输出时立即唤醒，空闲时每秒检查一次运行状态）
+            if recognizer.wait_for_output(timeout=1.0):
+                recognizer.process_pending_outputs()
     except KeyboardInterrupt:
         logger.info("\n收到退出信号...")
     finally:
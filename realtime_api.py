@@ -5,9 +5,10 @@ FunASR 实时识别 API 服务器
 """
 
 import asyncio
+import functools
 import json
 import logging
-from typing import TYPE_CHECKING, Set
+from typing import TYPE_CHECKING, Optional, Set
 
 if TYPE_CHECKING:
     from funasr_realtime import RealtimeRecognizer, RealtimeConfig
@@ -16,32 +17,60 @@ logger = logging.getLogger("FunASR-API")
 
 _websocket_clients: Set = set()
 _recognizer: "RealtimeRecognizer" = None
+# uvicorn 的事件循环，在首个 WebSocket 连接时记录；识别回调运行在其他线程，需经由它投递发送
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _broadcast(message: str):
+    """并发向所有 WebSocket 客户端发送消息，发送失败的连接直接移除"""
+    clients = list(_websocket_clients)
+    results = await asyncio.gather(
+        *(ws.send_text(message) for ws in clients),
+        return_exceptions=True
+    )
+    for ws, r in zip(clients, results):
+        if isinstance(r, Exception):
+            _websocket_clients.discard(ws)
+
+
+def _notify_clients(message: str):
+    """从任意线程提交一次广播"""
+    loop = _loop
+    if not _websocket_clients or loop is None or loop.is_closed():
+        return
+    asyncio.run_coroutine_threadsafe(_broadcast(message), loop)
 
 
 def _on_result(text: str):
     """识别结果回调"""
-    message = json.dumps({
+    _notify_clients(json.dumps({
         "type": "result",
         "text": text,
-    })
-    for ws in list(_websocket_clients):
-        try:
-            asyncio.create_task(ws.send_text(message))
-        except:
-            pass
+    }))
 
 
-def _on_status_change(status: str):
-    """状态变化回调"""
-    message = json.dumps({
+@functools.lru_cache(maxsize=None)
+def _status_message(status: str) -> str:
+    """状态广播消息；状态只有 sleeping/listening/recording 几种，编码一次后复用"""
+    return json.dumps({
         "type": "status",
         "status": status,
     })
-    for ws in list(_websocket_clients):
-        try:
-            asyncio.create_task(ws.send_text(message))
-        except:
-            pass
+
+
+@functools.lru_cache(maxsize=None)
+def _state_message(msg_type: str, is_listening: bool, is_recording: bool) -> str:
+    """connected / status_response 消息；只取决于两个布尔量，编码一次后复用"""
+    return json.dumps({
+        "type": msg_type,
+        "is_listening": is_listening,
+        "is_recording": is_recording,
+    })
+
+
+def _on_status_change(status: str):
+    """状态变化回调"""
+    _notify_clients(_status_message(status))
 
 
 def create_app(recognizer: "RealtimeRecognizer"):
@@ -102,6 +131,7 @@ def create_app(recognizer: "RealtimeRecognizer"):
         if recognizer.is_listening:
             recognizer.is_listening = False
             recognizer.is_recording = False
+            recognizer.asr_engine.reset_cache()
             recognizer._notify_status("sleeping")
         return {"success": True, "is_listening": False}
     
@@ -113,42 +143,42 @@ def create_app(recognizer: "RealtimeRecognizer"):
     
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
+        global _loop
+        _loop = asyncio.get_running_loop()
+        
         await websocket.accept()
         _websocket_clients.add(websocket)
         logger.info(f"WebSocket 连接: {len(_websocket_clients)} 个客户端")
         
         try:
-            await websocket.send_text(json.dumps({
-                "type": "connected",
-                "is_listening": recognizer.is_listening,
-                "is_recording": recognizer.is_recording,
-            }))
+            await websocket.send_text(_state_message(
+                "connected", bool(recognizer.is_listening), bool(recognizer.is_recording)
+            ))
             
             while True:
                 data = await websocket.receive_text()
                 try:
-                    msg = json.loads(data)
-                    action = msg.get("action")
-                    
-                    if action == "toggle":
-                        recognizer.toggle_listening()
-                    elif action == "start":
-                        recognizer.is_listening = True
-                        recognizer._notify_status("listening")
-                    elif action == "stop":
-                        recognizer.is_listening = False
-                        recognizer.is_recording = False
-                        recognizer._notify_status("sleeping")
-                    elif action == "process":
-                        recognizer.force_process()
-                    elif action == "status":
-                        await websocket.send_text(json.dumps({
-                            "type": "status_response",
-                            "is_listening": recognizer.is_listening,
-                            "is_recording": recognizer.is_recording,
-                        }))
-                except:
-                    pass
+                    action = json.loads(data).get("action")
+                except (json.JSONDecodeError, AttributeError):
+                    # 非 JSON 或不是对象，忽略
+                    continue
+                
+                if action == "toggle":
+                    recognizer.toggle_listening()
+                elif action == "start":
+                    recognizer.is_listening = True
+                    recognizer._notify_status("listening")
+                elif action == "stop":
+                    recognizer.is_listening = False
+                    recognizer.is_recording = False
+                    recognizer.asr_engine.reset_cache()
+                    recognizer._notify_status("sleeping")
+                elif action == "process":
+                    recognizer.force_process()
+                elif action == "status":
+                    await websocket.send_text(_state_message(
+                        "status_response", bool(recognizer.is_listening), bool(recognizer.is_recording)
+                    ))
                     
         except WebSocketDisconnect:
             pass
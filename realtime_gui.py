@@ -5,6 +5,8 @@ FunASR 实时识别 GUI 控制面板
 提供图形化界面来配置和控制实时语音识别
 """
 
+import copy
+import functools
 import os
 import sys
 import subprocess
@@ -20,24 +22,165 @@ from PyQt5.QtWidgets import (
     QCheckBox, QTextEdit, QSpinBox, QRadioButton, QButtonGroup,
     QMessageBox, QScrollArea, QFrame, QSlider, QProgressBar
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QObject
+from PyQt5.QtCore import Qt, QThread, QThreadPool, QRunnable, pyqtSignal, QTimer, QObject
 from PyQt5.QtGui import QFont
 
+try:
+    # macOS: 直接投递 Cmd+V 键盘事件，不必每次输出都启动 osascript 进程
+    import Quartz
+except ImportError:
+    Quartz = None
+
+# 'v' 键的虚拟键码（kVK_ANSI_V）
+_KEYCODE_V = 9
+
 # 配置文件路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(SCRIPT_DIR, "config_realtime.yaml")
 
+# 优先使用 libyaml 的 C 实现解析/写出配置
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def _set_clipboard(text: str):
+    """
+    写入系统剪贴板（须在主线程调用）
+    
+    优先使用 Qt 的 QClipboard（进程内、跨平台），没有 QApplication 实例时回退到 pbcopy。
+    """
+    app = QApplication.instance()
+    if app is not None:
+        app.clipboard().setText(text)
+        return
+    subprocess.run(['pbcopy'], input=text.encode('utf-8'), check=True,
+                   env={'LANG': 'en_US.UTF-8'})
+
+
+def _paste():
+    """模拟 Cmd+V：优先直接投递 Quartz 键盘事件，不可用时回退到 osascript"""
+    if Quartz is not None:
+        source = Quartz.CGEventSourceCreate(Quartz.kCGEventSourceStateHIDSystemState)
+        for key_down in (True, False):
+            event = Quartz.CGEventCreateKeyboardEvent(source, _KEYCODE_V, key_down)
+            Quartz.CGEventSetFlags(event, Quartz.kCGEventFlagMaskCommand)
+            Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+        return
+    script = '''
+    tell application "System Events"
+        keystroke "v" using command down
+    end tell
+    '''
+    subprocess.run(['osascript', '-e', script], check=True,
+                   capture_output=True, timeout=5)
+
+
+@functools.lru_cache(maxsize=1)
+def _query_input_devices() -> tuple:
+    """枚举音频输入设备；PortAudio 枚举较慢，结果缓存到显式刷新为止"""
+    return tuple(
+        {'index': i, 'name': dev['name'], 'channels': dev['max_input_channels']}
+        for i, dev in enumerate(sd.query_devices())
+        if dev['max_input_channels'] > 0
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime_ns: int) -> dict:
+    """解析 YAML 文件；以 (路径, 修改时间) 为键缓存，文件改动后自动重新解析"""
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
 
 class SignalBridge(QObject):
     """信号桥接器，用于跨线程通信"""
     status_signal = pyqtSignal(str)
     result_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
-    level_signal = pyqtSignal(float)
     output_signal = pyqtSignal(str)  # 输出信号 - 用于在主线程中执行输出
 
 
+class RecognizerTask(QRunnable):
+    """后台识别任务：清理旧进程、加载模型并启动识别器，阻塞到停止事件后收尾"""
+    
+    def __init__(self, window: "MainWindow", stop_event: threading.Event, done_event: threading.Event):
+        super().__init__()
+        self._window = window
+        self._stop_event = stop_event
+        self._done_event = done_event
+    
+    def run(self):
+        try:
+            self._run(self._window)
+        finally:
+            self._done_event.set()
+    
+    def _run(self, window: "MainWindow"):
+        try:
+            # 终止已存在的进程（在后台线程中进行，不阻塞界面）
+            window.kill_existing()
+            
+            from funasr_realtime import RealtimeRecognizer, RealtimeConfig
+            
+            config = RealtimeConfig.from_yaml(CONFIG_PATH)
+            
+            # GUI 模式下禁用快捷键（避免 pynput 与 PyQt5 冲突）
+            config.hotkey_toggle = ""
+            config.hotkey_force = ""
+            
+            window.recognizer = RealtimeRecognizer(config)
+            
+            # 禁用快捷键管理器
+            window.recognizer.hotkey_manager._enabled = False
+            
+            # 设置回调 - 使用线程安全的方式
+            def on_result(text):
+                # 使用 QMetaObject.invokeMethod 确保在主线程执行
+                window.signals.result_signal.emit(text)
+            
+            def on_status(status):
+                window.signals.status_signal.emit(status)
+            
+            # 设置输出回调 - 通过信号在主线程中执行输出
+            def on_output(text):
+                window.signals.output_signal.emit(text)
+            
+            window.recognizer.on_result = on_result
+            window.recognizer.on_status_change = on_status
+            window.recognizer.on_output = on_output  # 关键：设置输出回调
+            
+            # 启动（不启动快捷键监听）
+            window.recognizer.start_without_hotkeys()
+            
+            # 通知启动完成（模型已加载、音频流已打开），界面据此启用按钮
+            window.signals.status_signal.emit("started")
+            
+            # 等待停止
+            self._stop_event.wait()
+        
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            window.signals.error_signal.emit(str(e))
+        finally:
+            if window.recognizer:
+                window.recognizer.stop()
+                window.recognizer = None
+
+
 class MainWindow(QMainWindow):
+    LEVEL_REFRESH_MS = 50  # 电平刷新间隔（毫秒），约 20 Hz
+    STOP_POLL_MS = 50      # 停止服务时检查识别任务是否结束的间隔（毫秒）
+    
+    _STATUS_MAP = {
+        "started": "✅ 已启动",
+        "sleeping": "💤 休眠中",
+        "listening": "👂 监听中",
+        "recording": "🎤 录音中",
+    }
+    _STYLE_START = "background-color: #4CAF50; color: white; font-weight: bold; padding: 8px;"
+    _STYLE_STOP = "background-color: #f44336; color: white; font-weight: bold; padding: 8px;"
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FunASR 实时语音识别")
@@ -48,27 +191,35 @@ class MainWindow(QMainWindow):
         self.signals.status_signal.connect(self.on_status_changed)
         self.signals.result_signal.connect(self.on_result_received)
         self.signals.error_signal.connect(self.on_error)
-        self.signals.level_signal.connect(self.update_level)
         self.signals.output_signal.connect(self.do_output_in_main_thread)
         
-        # 加载配置
+        # 加载配置；_last_saved_config 记录与文件内容一致的配置，未改动时不再重写文件
+        self._last_saved_config = None
         self.config = self.load_config()
+        # 界面设置有未保存的改动（关闭窗口时自动保存）
+        self._dirty = False
         
-        # 获取音频设备
-        self.audio_devices = self.get_audio_devices()
+        # 音频设备（在 _build_rest 中枚举）
+        self.audio_devices = []
         
         # 状态
         self.is_running = False
         self.recognizer = None
-        self.recognizer_thread = None
-        self.level_thread = None
-        self.level_running = False
-        
-        # 创建界面
+        self._level_stream = None  # 电平监测输入流
+        # 停止事件：每次启动时新建，旧线程即使尚未退出也只会看到自己的事件
+        self._service_stop = threading.Event()
+        # 识别任务结束事件（未启动时视为已结束）
+        self._service_done = threading.Event()
+        self._service_done.set()
+        
+        # 音频电平：回调线程只更新峰值，主线程定时读取并刷新进度条，不跨线程发送信号
+        self._level_peak = 0.0
+        self._level_timer = QTimer(self)
+        self._level_timer.setInterval(self.LEVEL_REFRESH_MS)
+        self._level_timer.timeout.connect(self._refresh_level)
+        
+        # 创建界面：状态面板同步构建，其余面板与音频电平监测在窗口首次绘制后进行
         self.init_ui()
-        
-        # 启动音频电平监测
-        self.start_level_monitor()
     
     def load_config(self) -> dict:
         """加载配置"""
@@ -97,11 +248,13 @@ class MainWindow(QMainWindow):
         
         if os.path.exists(CONFIG_PATH):
             try:
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    loaded = yaml.safe_load(f) or {}
-                    default_config.update(loaded)
-            except:
-                pass
+                # 缓存的字典是共享的，深拷贝后再合并，避免列表被界面修改
+                loaded = _load_yaml_cached(CONFIG_PATH, os.stat(CONFIG_PATH).st_mtime_ns)
+                default_config.update(copy.deepcopy(loaded))
+                self._last_saved_config = copy.deepcopy(default_config)
+            except (OSError, yaml.YAMLError, TypeError, ValueError) as e:
+                # 读取失败或内容不是映射，使用默认配置
+                print(f"加载配置失败: {e}")
         
         return default_config
     
@@ -140,9 +293,19 @@ class MainWindow(QMainWindow):
             self.config['api_enabled'] = self.api_enabled.isChecked()
             self.config['api_port'] = self.api_port.value()
             
-            # 写入文件
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, allow_unicode=True, default_flow_style=False)
+            # 与上次保存的内容相同则跳过写入
+            if self.config == self._last_saved_config and os.path.exists(CONFIG_PATH):
+                self._dirty = False
+                return True
+            
+            # 写入临时文件后原子替换，读取方不会看到写了一半的配置
+            tmp_path = CONFIG_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                yaml.dump(self.config, f, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False)
+            os.replace(tmp_path, CONFIG_PATH)
+            _load_yaml_cached.cache_clear()
+            self._last_saved_config = copy.deepcopy(self.config)
+            self._dirty = False
             
             return True
         except Exception as e:
@@ -150,20 +313,12 @@ class MainWindow(QMainWindow):
             return False
     
     def get_audio_devices(self) -> list:
-        """获取音频输入设备"""
-        devices = []
+        """获取音频输入设备（会话内缓存，点击刷新时才重新枚举）"""
         try:
-            all_devices = sd.query_devices()
-            for i, dev in enumerate(all_devices):
-                if dev['max_input_channels'] > 0:
-                    devices.append({
-                        'index': i,
-                        'name': dev['name'],
-                        'channels': dev['max_input_channels'],
-                    })
-        except:
-            pass
-        return devices
+            return list(_query_input_devices())
+        except sd.PortAudioError as e:
+            print(f"枚举音频设备失败: {e}")
+            return []
     
     def init_ui(self):
         """初始化界面"""
@@ -177,7 +332,20 @@ class MainWindow(QMainWindow):
         content = QWidget()
         layout = QVBoxLayout(content)
         layout.setSpacing(8)
+        self._content_layout = layout
         
+        self._build_status_panel(layout)
+        
+        scroll.setWidget(content)
+        
+        main_layout = QVBoxLayout(central)
+        main_layout.setContentsMargins(5, 5, 5, 5)
+        main_layout.addWidget(scroll)
+        
+        QTimer.singleShot(0, self._build_rest)
+    
+    def _build_status_panel(self, layout: QVBoxLayout):
+        """构建状态面板（窗口显示时即可见）"""
         # ========== 状态面板 ==========
         status_group = QGroupBox("📊 状态")
         status_layout = QVBoxLayout()
@@ -209,7 +377,8 @@ class MainWindow(QMainWindow):
         btn_row = QHBoxLayout()
         
         self.start_btn = QPushButton("▶️ 启动")
-        self.start_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold; padding: 8px;")
+        self.start_btn.setStyleSheet(self._STYLE_START)
+        self.start_btn.setEnabled(False)
         self.start_btn.clicked.connect(self.toggle_service)
         btn_row.addWidget(self.start_btn)
         
@@ -226,6 +395,11 @@ class MainWindow(QMainWindow):
         status_layout.addLayout(btn_row)
         status_group.setLayout(status_layout)
         layout.addWidget(status_group)
+    
+    def _build_rest(self):
+        """构建其余设置面板，枚举音频设备并启动电平监测"""
+        layout = self._content_layout
+        self.audio_devices = self.get_audio_devices()
         
         # ========== 音频设备 ==========
         audio_group = QGroupBox("🎤 音频设备")
@@ -400,11 +574,34 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(btn_layout)
         
-        scroll.setWidget(content)
+        # 控件初值已填好，此后的改动标记为未保存
+        mark_dirty = self._mark_dirty
+        for signal in (
+            self.device_combo.currentIndexChanged,
+            self.threshold_slider.valueChanged,
+            self.silence_slider.valueChanged,
+            self.hotkey_toggle.textChanged,
+            self.hotkey_force.textChanged,
+            self.output_mode_group.buttonToggled,
+            self.lang_combo.currentTextChanged,
+            self.hotwords_edit.textChanged,
+            self.wake_enabled.toggled,
+            self.wake_words_edit.textChanged,
+            self.sleep_words_edit.textChanged,
+            self.api_enabled.toggled,
+            self.api_port.valueChanged,
+        ):
+            signal.connect(mark_dirty)
+        
+        # 设置面板就绪后才允许启动服务（启动时需要从各控件收集配置）
+        self.start_btn.setEnabled(True)
         
-        main_layout = QVBoxLayout(central)
-        main_layout.setContentsMargins(5, 5, 5, 5)
-        main_layout.addWidget(scroll)
+        # 启动音频电平监测
+        self.start_level_monitor()
+    
+    def _mark_dirty(self, *_):
+        """控件改动回调"""
+        self._dirty = True
     
     def update_device_combo(self):
         """更新设备下拉框"""
@@ -425,6 +622,7 @@ class MainWindow(QMainWindow):
     
     def refresh_devices(self):
         """刷新设备"""
+        _query_input_devices.cache_clear()
         self.audio_devices = self.get_audio_devices()
         self.update_device_combo()
         self.restart_level_monitor()
@@ -439,43 +637,59 @@ class MainWindow(QMainWindow):
         if device_idx is None or device_idx < 0:
             return
         
-        self.level_running = True
+        # 预分配的绝对值缓冲区：回调中不再为每个块分配临时数组（块大小由 PortAudio 决定，超出时才扩容）
+        scratch = np.empty(1600, dtype=np.float32)
         
-        def monitor():
-            try:
-                def callback(indata, frames, time_info, status):
-                    if self.level_running:
-                        level = np.abs(indata).mean()
-                        self.signals.level_signal.emit(level)
-                
-                with sd.InputStream(
-                    device=device_idx,
-                    samplerate=16000,
-                    channels=1,
-                    callback=callback,
-                    blocksize=1600
-                ):
-                    while self.level_running:
-                        time.sleep(0.05)
-            except Exception as e:
-                print(f"音频监测错误: {e}")
+        def callback(indata, frames, time_info, status):
+            nonlocal scratch
+            if frames > len(scratch):
+                scratch = np.empty(frames, dtype=np.float32)
+            # 与识别器静音检测一致，用平均绝对幅度作为音量；两次刷新之间只保留峰值
+            # 单声道 float32：ravel 是零拷贝视图
+            level = float(np.abs(indata.ravel(), out=scratch[:frames]).mean())
+            if level > self._level_peak:
+                self._level_peak = level
         
-        self.level_thread = threading.Thread(target=monitor, daemon=True)
-        self.level_thread.start()
+        # 直接持有输入流（回调运行在 PortAudio 线程），停止时可同步关闭，不再需要监测线程
+        try:
+            self._level_stream = sd.InputStream(
+                device=device_idx,
+                samplerate=16000,
+                channels=1,
+                dtype='float32',
+                callback=callback,
+                blocksize=0,     # 由 PortAudio 选择最小的可用块大小
+                latency='low',
+            )
+            self._level_stream.start()
+        except Exception as e:
+            self._level_stream = None
+            print(f"音频监测错误: {e}")
+            return
+        self._level_timer.start()
     
     def stop_level_monitor(self):
-        """停止音频电平监测"""
-        self.level_running = False
-        if self.level_thread:
-            self.level_thread.join(timeout=1)
-            self.level_thread = None
+        """停止音频电平监测：abort + close 返回时设备已释放"""
+        self._level_timer.stop()
+        stream, self._level_stream = self._level_stream, None
+        if stream is not None:
+            try:
+                stream.abort()
+                stream.close()
+            except Exception as e:
+                print(f"关闭音频监测失败: {e}")
+        self._level_peak = 0.0
     
     def restart_level_monitor(self):
         """重启音频电平监测"""
         self.stop_level_monitor()
-        time.sleep(0.2)
         self.start_level_monitor()
     
+    def _refresh_level(self):
+        """定时器回调：取出并清零峰值电平"""
+        level, self._level_peak = self._level_peak, 0.0
+        self.update_level(level)
+    
     def update_level(self, level):
         """更新音频电平"""
         value = min(100, int(level * 1000))
@@ -498,70 +712,16 @@ class MainWindow(QMainWindow):
         if not self.save_config():
             return
         
-        # 终止已存在的进程
-        self.kill_existing()
-        
         self.status_label.setText("⏳ 启动中...")
         self.start_btn.setEnabled(False)
-        QApplication.processEvents()
-        
-        # 在后台线程启动识别器
-        def run_recognizer():
-            try:
-                from funasr_realtime import RealtimeRecognizer, RealtimeConfig
-                
-                config = RealtimeConfig.from_yaml(CONFIG_PATH)
-                
-                # GUI 模式下禁用快捷键（避免 pynput 与 PyQt5 冲突）
-                config.hotkey_toggle = ""
-                config.hotkey_force = ""
-                
-                self.recognizer = RealtimeRecognizer(config)
-                
-                # 禁用快捷键管理器
-                self.recognizer.hotkey_manager._enabled = False
-                
-                # 设置回调 - 使用线程安全的方式
-                def on_result(text):
-                    # 使用 QMetaObject.invokeMethod 确保在主线程执行
-                    self.signals.result_signal.emit(text)
-                
-                def on_status(status):
-                    self.signals.status_signal.emit(status)
-                
-                # 设置输出回调 - 通过信号在主线程中执行输出
-                def on_output(text):
-                    self.signals.output_signal.emit(text)
-                
-                self.recognizer.on_result = on_result
-                self.recognizer.on_status_change = on_status
-                self.recognizer.on_output = on_output  # 关键：设置输出回调
-                
-                # 启动（不启动快捷键监听）
-                self.recognizer.start_without_hotkeys()
-                
-                # 通知启动完成
-                self.signals.status_signal.emit("started")
-                
-                # 等待停止
-                while self.is_running and self.recognizer.is_running:
-                    time.sleep(0.1)
-                    
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                self.signals.error_signal.emit(str(e))
-            finally:
-                if self.recognizer:
-                    self.recognizer.stop()
-                    self.recognizer = None
         
+        # 在线程池中启动识别器
         self.is_running = True
-        self.recognizer_thread = threading.Thread(target=run_recognizer, daemon=True)
-        self.recognizer_thread.start()
-        
-        # 延迟更新 UI
-        QTimer.singleShot(3000, self.on_service_started)
+        self._service_stop = threading.Event()
+        self._service_done = threading.Event()
+        QThreadPool.globalInstance().start(
+            RecognizerTask(self, self._service_stop, self._service_done)
+        )
     
     def on_service_started(self):
         """服务启动后"""
@@ -569,29 +729,34 @@ class MainWindow(QMainWindow):
             return
         
         self.start_btn.setText("⏹️ 停止")
-        self.start_btn.setStyleSheet("background-color: #f44336; color: white; font-weight: bold; padding: 8px;")
+        self.start_btn.setStyleSheet(self._STYLE_STOP)
         self.start_btn.setEnabled(True)
         self.toggle_btn.setEnabled(True)
         self.force_btn.setEnabled(True)
     
     def stop_service(self):
-        """停止服务"""
+        """停止服务：通知识别任务退出后立即返回，任务自行停止识别器，界面轮询其结束后收尾"""
         self.is_running = False
+        self._service_stop.set()
         
-        if self.recognizer:
-            self.recognizer.stop()
-        
-        if self.recognizer_thread:
-            self.recognizer_thread.join(timeout=3)
-            self.recognizer_thread = None
+        self.status_label.setText("⏳ 停止中...")
+        self.start_btn.setEnabled(False)
+        self.toggle_btn.setEnabled(False)
+        self.force_btn.setEnabled(False)
+        self._check_service_stopped()
+    
+    def _check_service_stopped(self):
+        """识别任务结束后恢复界面，未结束则稍后再检查"""
+        if not self._service_done.is_set():
+            QTimer.singleShot(self.STOP_POLL_MS, self._check_service_stopped)
+            return
         
         self.recognizer = None
         
         self.status_label.setText("⏹️ 已停止")
         self.start_btn.setText("▶️ 启动")
-        self.start_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold; padding: 8px;")
-        self.toggle_btn.setEnabled(False)
-        self.force_btn.setEnabled(False)
+        self.start_btn.setStyleSheet(self._STYLE_START)
+        self.start_btn.setEnabled(True)
     
     def toggle_listening(self):
         """切换监听"""
@@ -605,15 +770,11 @@ class MainWindow(QMainWindow):
     
     def on_status_changed(self, status):
         """状态变化"""
-        status_map = {
-            "started": "✅ 已启动",
-            "sleeping": "💤 休眠中",
-            "listening": "👂 监听中",
-            "recording": "🎤 录音中",
-        }
-        self.status_label.setText(status_map.get(status, status))
+        self.status_label.setText(self._STATUS_MAP.get(status, status))
         
-        if status == "listening":
+        if status == "started":
+            self.on_service_started()
+        elif status == "listening":
             self.toggle_btn.setText("⏸️ 暂停")
         elif status == "sleeping":
             self.toggle_btn.setText("▶️ 继续")
@@ -637,64 +798,51 @@ class MainWindow(QMainWindow):
         
         mode = self.config.get('output_mode', 'clipboard')
         
+        copied = False
         if mode in ("clipboard", "both"):
-            self._copy_to_clipboard(text)
+            copied = self._copy_to_clipboard(text)
         
         if mode in ("type", "both"):
-            self._type_text(text)
+            self._type_text(text, copied=copied)
     
-    def _copy_to_clipboard(self, text: str):
+    def _copy_to_clipboard(self, text: str) -> bool:
         """复制到剪贴板"""
         try:
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
+            _set_clipboard(text)
+            return True
         except Exception as e:
             print(f"复制失败: {e}")
+            return False
     
-    def _type_text(self, text: str):
-        """模拟输入 - 必须在主线程中调用"""
+    def _type_text(self, text: str, copied: bool = False):
+        """模拟输入 - 必须在主线程中调用（已复制过时不再重复写剪贴板）"""
         try:
             # 先复制到剪贴板
-            process = subprocess.Popen(
-                ['pbcopy'],
-                stdin=subprocess.PIPE,
-                env={'LANG': 'en_US.UTF-8'}
-            )
-            process.communicate(text.encode('utf-8'))
-            
-            time.sleep(0.05)
+            if not copied:
+                _set_clipboard(text)
+                time.sleep(0.05)
             
             # 模拟 Cmd+V
-            script = '''
-            tell application "System Events"
-                keystroke "v" using command down
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', script], check=True, 
-                         capture_output=True, timeout=5)
+            _paste()
         except Exception as e:
             print(f"输入失败: {e}")
     
     def kill_existing(self):
         """终止已存在的进程"""
         try:
-            subprocess.run(['pkill', '-f', 'funasr_realtime.py'], capture_output=True)
-            subprocess.run(['pkill', '-f', 'funasr_live.py'], capture_output=True)
-            
-            port = self.config.get('api_port', 8765)
-            result = subprocess.run(['lsof', '-ti', f':{port}'], capture_output=True, text=True)
-            if result.stdout.strip():
-                for pid in result.stdout.strip().split('\n'):
-                    if pid:
-                        subprocess.run(['kill', '-9', pid], capture_output=True)
+            # 合并为一条 shell 命令，只启动一个子进程；
+            # 模式写成 [f]unasr_... 以免 pkill 匹配到这条 sh 命令自身
+            port = int(self.config.get('api_port', 8765))
+            subprocess.run(
+                ['sh', '-c',
+                 "pkill -f '[f]unasr_realtime.py'; pkill -f '[f]unasr_live.py'; "
+                 f'pids=$(lsof -ti :{port}); [ -n "$pids" ] && kill -9 $pids'],
+                capture_output=True, timeout=2
+            )
             
             time.sleep(0.3)
-        except:
-            pass
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"清理旧进程失败: {e}")
     
     def closeEvent(self, event):
         """关闭"""
@@ -710,7 +858,11 @@ class MainWindow(QMainWindow):
                 return
         
         self.stop_service()
+        # 退出前等待识别任务释放音频设备与模型
+        self._service_done.wait(timeout=3)
         self.stop_level_monitor()
+        if self._dirty:
+            self.save_config()
         event.accept()
 
 
@@ -718,8 +870,8 @@ def main():
     # 终止已存在的进程
     try:
         subprocess.run(['pkill', '-f', 'funasr_realtime.py'], capture_output=True)
-    except:
-        pass
+    except OSError as e:
+        print(f"清理旧进程失败: {e}")
     
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
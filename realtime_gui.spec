@@ -42,6 +42,7 @@ if sys.platform == 'darwin':
     hiddenimports.extend([
         'AppKit',
         'Foundation',
+        'Quartz',
     ])
 elif sys.platform == 'win32':
     hiddenimports.extend([
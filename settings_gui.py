@@ -5,61 +5,171 @@ FunASR Live 设置界面 (PyQt5)
 提供图形化配置界面，支持音频设备选择
 """
 
+import copy
+import functools
 import os
+import re
 import sys
-import yaml
-import sounddevice as sd
-import numpy as np
 
+# yaml / sounddevice / numpy 仅在读写配置、枚举设备和测试麦克风时用到，在函数内按需导入以加快界面启动
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QGroupBox, QLabel, QLineEdit, QComboBox, QPushButton,
     QCheckBox, QTextEdit, QSpinBox, QRadioButton, QButtonGroup,
     QMessageBox, QScrollArea, QFrame
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 
 # 配置文件路径
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
 
+# 快捷键格式：以 + 连接的键名，键名与 funasr_live.py 的 HotkeyManager 可解析的一致（命名键或任意单个字符）
+_HOTKEY_PART = (r'\s*(?:ctrl|control|alt|option|shift|cmd|command|escape|esc|space|enter|return|tab'
+                r'|f(?:1[0-2]|[1-9])|[^+\s])\s*')
+_HOTKEY_RE = re.compile(rf'{_HOTKEY_PART}(?:\+{_HOTKEY_PART})*')
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime_ns: int, size: int) -> dict:
+    """解析 YAML 文件；以 (路径, 修改时间, 大小) 为键缓存，文件改动后自动重新解析"""
+    import yaml
+    
+    # 优先使用 libyaml 的 C 实现，纯 Python 解析器慢一个数量级
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
+@functools.lru_cache(maxsize=1)
+def _query_input_devices() -> tuple:
+    """枚举音频输入设备；PortAudio 枚举较慢，结果缓存到显式刷新为止"""
+    import sounddevice as sd
+    
+    return tuple(
+        {'index': i, 'name': dev['name'], 'channels': dev['max_input_channels']}
+        for i, dev in enumerate(sd.query_devices())
+        if dev['max_input_channels'] > 0
+    )
+
+
+def _wait_port_free(host: str, port: int, timeout: float = 1.0) -> bool:
+    """轮询直到端口可以绑定（旧进程已退出），最多等待 timeout 秒"""
+    import socket
+    import time
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # 与 uvicorn 一致设置 SO_REUSEADDR，TIME_WAIT 状态的连接不算占用
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                s.bind((host, port))
+                return True
+            except OSError:
+                pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+
 
 class AudioTestThread(QThread):
-    """音频测试线程"""
+    """音频测试线程；输入流在首次测试时打开，之后的测试复用，切换设备时才重新打开"""
     finished = pyqtSignal(float, float, str)  # avg_volume, max_volume, error
     
-    def __init__(self, device_idx):
+    DURATION = 2          # 秒
+    SAMPLE_RATE = 16000
+    BLOCK_SIZE = 1024
+    
+    def __init__(self):
         super().__init__()
-        self.device_idx = device_idx
-        
-    def run(self):
-        try:
-            duration = 2  # 秒
-            sample_rate = 16000
-            
-            recording = sd.rec(
-                int(duration * sample_rate),
-                samplerate=sample_rate,
+        self.device_idx = None
+        self._stream = None
+        self._stream_device = None
+        # 由音频回调逐块累计的统计量
+        self._sum = 0.0
+        self._frames = 0
+        self._max = 0.0
+    
+    def _make_audio_callback(self):
+        """构造 PortAudio 回调：把绝对值写入预分配的缓冲区后累计总和与峰值，不保留音频数据。
+        
+        numpy 在这里导入一次，回调内不再执行 import；indata 是 PortAudio 的输入缓冲区，只读不写。
+        """
+        import numpy as np
+        
+        scratch = np.empty(self.BLOCK_SIZE, dtype=np.float32)
+        
+        def callback(indata, frames, time_info, status):
+            nonlocal scratch
+            if frames > len(scratch):
+                scratch = np.empty(frames, dtype=np.float32)
+            # 取绝对值与求峰值保持 float32；求和显式用 float64 累加器，长时间累计不丢精度
+            block = np.abs(indata.ravel(), out=scratch[:frames])
+            self._sum += float(block.sum(dtype=np.float64))
+            self._frames += frames
+            self._max = max(self._max, float(block.max()))
+        
+        return callback
+    
+    def _get_stream(self):
+        """返回当前设备的输入流，设备变化时关闭旧流并重新打开"""
+        import sounddevice as sd
+        
+        if self._stream is None or self._stream_device != self.device_idx:
+            self.close_stream()
+            self._stream = sd.InputStream(
+                samplerate=self.SAMPLE_RATE,
                 channels=1,
                 device=self.device_idx,
-                dtype='float32'
+                dtype='float32',
+                blocksize=self.BLOCK_SIZE,
+                callback=self._make_audio_callback()
             )
-            sd.wait()
+            self._stream_device = self.device_idx
+        return self._stream
+    
+    def close_stream(self):
+        """关闭输入流"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self._stream_device = None
+        
+    def run(self):
+        try:
+            stream = self._get_stream()
+            self._sum = 0.0
+            self._frames = 0
+            self._max = 0.0
             
-            volume = np.abs(recording).mean()
-            max_volume = np.abs(recording).max()
+            # 录音期间由回调累计统计量；stop() 返回时回调已全部执行完毕
+            stream.start()
+            try:
+                self.msleep(int(self.DURATION * 1000))
+            finally:
+                stream.stop()
             
-            self.finished.emit(volume, max_volume, "")
+            volume = self._sum / self._frames if self._frames else 0.0
+            self.finished.emit(volume, self._max, "")
         except Exception as e:
+            self.close_stream()
             self.finished.emit(0, 0, str(e))
 
 
 class SettingsWindow(QMainWindow):
+    # 样式表
+    _STYLE_WARN = "color: red; font-weight: bold;"
+    _STYLE_HINT = "color: gray;"
+    _STYLE_START = "background-color: #4CAF50; color: white; font-weight: bold;"
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FunASR Live 设置")
         self.setMinimumSize(550, 650)
         
+        # 麦克风测试线程，首次测试时创建
+        self.test_thread = None
+        
         # 加载配置
         self.config = self.load_config()
         
@@ -95,35 +205,32 @@ class SettingsWindow(QMainWindow):
             'audio_device': None,
         }
         
-        if os.path.exists(CONFIG_PATH):
-            try:
-                with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                    loaded = yaml.safe_load(f) or {}
-                    default_config.update(loaded)
-                print(f"✓ 已加载配置: {CONFIG_PATH}")
-            except Exception as e:
-                print(f"⚠ 加载配置失败: {e}")
+        # 直接 stat，文件不存在时由异常得知，不再先 exists 再打开
+        try:
+            st = os.stat(CONFIG_PATH)
+        except FileNotFoundError:
+            return default_config
+        
+        try:
+            # 深拷贝缓存结果，界面修改配置时不会污染缓存
+            loaded = copy.deepcopy(_load_yaml(CONFIG_PATH, st.st_mtime_ns, st.st_size))
+            default_config.update(loaded)
+            print(f"✓ 已加载配置: {CONFIG_PATH}")
+        except Exception as e:
+            print(f"⚠ 加载配置失败: {e}")
         
         return default_config
     
     def get_audio_devices(self) -> list:
-        """获取音频输入设备列表"""
-        devices = []
+        """获取音频输入设备列表（进程内缓存，点击刷新时才重新枚举）"""
         try:
-            all_devices = sd.query_devices()
-            for i, dev in enumerate(all_devices):
-                if dev['max_input_channels'] > 0:
-                    devices.append({
-                        'index': i,
-                        'name': dev['name'],
-                        'channels': dev['max_input_channels'],
-                    })
+            return list(_query_input_devices())
         except Exception as e:
             print(f"获取音频设备失败: {e}")
-        return devices
+            return []
     
     def init_ui(self):
-        """初始化界面"""
+        """初始化界面：窗口显示时先构建音频设备与快捷键两组，其余设置在事件循环空闲后追加"""
         # 主窗口
         central = QWidget()
         self.setCentralWidget(central)
@@ -136,7 +243,29 @@ class SettingsWindow(QMainWindow):
         content = QWidget()
         layout = QVBoxLayout(content)
         layout.setSpacing(10)
+        self._content_layout = layout
         
+        for build in (self._build_audio_group, self._build_hotkey_group):
+            layout.addWidget(build())
+        
+        scroll.setWidget(content)
+        
+        main_layout = QVBoxLayout(central)
+        main_layout.addWidget(scroll)
+        
+        QTimer.singleShot(0, self._build_rest)
+    
+    def _build_rest(self):
+        """构建其余设置分组与底部按钮"""
+        layout = self._content_layout
+        for build in (self._build_output_group, self._build_recog_group, self._build_api_group):
+            layout.addWidget(build())
+        
+        layout.addLayout(self._build_buttons())
+        layout.addStretch()
+    
+    def _build_audio_group(self) -> QGroupBox:
+        """音频设备分组"""
         # ========== 音频设备 ==========
         audio_group = QGroupBox("🎤 音频设备")
         audio_layout = QVBoxLayout()
@@ -166,12 +295,14 @@ class SettingsWindow(QMainWindow):
         # 警告信息
         if not self.audio_devices:
             warn_label = QLabel("⚠️ 未检测到麦克风！请连接外部麦克风或 AirPods")
-            warn_label.setStyleSheet("color: red; font-weight: bold;")
+            warn_label.setStyleSheet(self._STYLE_WARN)
             audio_layout.addWidget(warn_label)
         
         audio_group.setLayout(audio_layout)
-        layout.addWidget(audio_group)
-        
+        return audio_group
+    
+    def _build_hotkey_group(self) -> QGroupBox:
+        """快捷键分组"""
         # ========== 快捷键 ==========
         hotkey_group = QGroupBox("⌨️ 快捷键")
         hotkey_layout = QVBoxLayout()
@@ -193,12 +324,14 @@ class SettingsWindow(QMainWindow):
         hotkey_layout.addLayout(row2)
         
         hint = QLabel("支持: ctrl, alt, shift, cmd, f1-f12, escape, space")
-        hint.setStyleSheet("color: gray;")
+        hint.setStyleSheet(self._STYLE_HINT)
         hotkey_layout.addWidget(hint)
         
         hotkey_group.setLayout(hotkey_layout)
-        layout.addWidget(hotkey_group)
-        
+        return hotkey_group
+    
+    def _build_output_group(self) -> QGroupBox:
+        """输出设置分组"""
         # ========== 输出设置 ==========
         output_group = QGroupBox("📤 输出设置")
         output_layout = QVBoxLayout()
@@ -221,8 +354,10 @@ class SettingsWindow(QMainWindow):
             output_layout.addWidget(radio)
         
         output_group.setLayout(output_layout)
-        layout.addWidget(output_group)
-        
+        return output_group
+    
+    def _build_recog_group(self) -> QGroupBox:
+        """识别设置分组"""
         # ========== 识别设置 ==========
         recog_group = QGroupBox("🗣️ 识别设置")
         recog_layout = QVBoxLayout()
@@ -253,8 +388,10 @@ class SettingsWindow(QMainWindow):
         recog_layout.addWidget(self.hotwords_edit)
         
         recog_group.setLayout(recog_layout)
-        layout.addWidget(recog_group)
-        
+        return recog_group
+    
+    def _build_api_group(self) -> QGroupBox:
+        """API 设置分组"""
         # ========== API 设置 ==========
         api_group = QGroupBox("🌐 API 设置")
         api_layout = QVBoxLayout()
@@ -273,8 +410,10 @@ class SettingsWindow(QMainWindow):
         api_layout.addLayout(port_row)
         
         api_group.setLayout(api_layout)
-        layout.addWidget(api_group)
-        
+        return api_group
+    
+    def _build_buttons(self) -> QHBoxLayout:
+        """底部按钮行"""
         # ========== 按钮 ==========
         btn_layout = QHBoxLayout()
         
@@ -284,44 +423,45 @@ class SettingsWindow(QMainWindow):
         
         start_btn = QPushButton("🚀 保存并启动")
         start_btn.clicked.connect(self.save_and_start)
-        start_btn.setStyleSheet("background-color: #4CAF50; color: white; font-weight: bold;")
+        start_btn.setStyleSheet(self._STYLE_START)
         btn_layout.addWidget(start_btn)
         
         quit_btn = QPushButton("❌ 退出")
         quit_btn.clicked.connect(self.close)
         btn_layout.addWidget(quit_btn)
         
-        layout.addLayout(btn_layout)
-        layout.addStretch()
-        
-        scroll.setWidget(content)
-        
-        main_layout = QVBoxLayout(central)
-        main_layout.addWidget(scroll)
+        return btn_layout
     
     def update_device_combo(self):
-        """更新设备下拉框"""
-        self.device_combo.clear()
-        
-        if self.audio_devices:
-            for d in self.audio_devices:
-                self.device_combo.addItem(
-                    f"[{d['index']}] {d['name']} ({d['channels']}ch)",
-                    d['index']
-                )
+        """更新设备下拉框：一次性批量填充，期间暂停重绘与信号"""
+        combo = self.device_combo
+        combo.setUpdatesEnabled(False)
+        combo.blockSignals(True)
+        try:
+            combo.clear()
             
-            # 选择之前保存的设备
-            saved = self.config.get('audio_device')
-            if saved is not None:
+            if self.audio_devices:
+                combo.addItems([f"[{d['index']}] {d['name']} ({d['channels']}ch)" for d in self.audio_devices])
+                model = combo.model()
                 for i, d in enumerate(self.audio_devices):
-                    if d['index'] == saved:
-                        self.device_combo.setCurrentIndex(i)
-                        break
-        else:
-            self.device_combo.addItem("无可用输入设备", -1)
+                    model.setData(model.index(i, 0), d['index'], Qt.UserRole)
+                
+                # 选择之前保存的设备
+                saved = self.config.get('audio_device')
+                if saved is not None:
+                    # 设备索引已存为 UserRole 数据，由 Qt 直接查找位置
+                    pos = combo.findData(saved)
+                    if pos >= 0:
+                        combo.setCurrentIndex(pos)
+            else:
+                combo.addItem("无可用输入设备", -1)
+        finally:
+            combo.blockSignals(False)
+            combo.setUpdatesEnabled(True)
     
     def refresh_devices(self):
         """刷新设备列表"""
+        _query_input_devices.cache_clear()
         self.audio_devices = self.get_audio_devices()
         self.update_device_combo()
         QMessageBox.information(self, "刷新", f"找到 {len(self.audio_devices)} 个输入设备")
@@ -335,8 +475,13 @@ class SettingsWindow(QMainWindow):
         
         QMessageBox.information(self, "测试", "将录制 2 秒音频...\n请对着麦克风说话")
         
-        self.test_thread = AudioTestThread(device_idx)
-        self.test_thread.finished.connect(self.on_test_finished)
+        if self.test_thread is None:
+            self.test_thread = AudioTestThread()
+            self.test_thread.finished.connect(self.on_test_finished)
+        elif self.test_thread.isRunning():
+            return
+        
+        self.test_thread.device_idx = device_idx
         self.test_thread.start()
     
     def on_test_finished(self, avg_vol, max_vol, error):
@@ -356,28 +501,31 @@ class SettingsWindow(QMainWindow):
                 f"请检查麦克风是否正常工作")
     
     def save_config(self):
-        """保存配置"""
+        """保存配置，成功返回 True"""
+        import yaml
+        
+        # 校验快捷键格式
+        for edit, name in ((self.hotkey_start, "开始/停止录音"), (self.hotkey_cancel, "取消录音")):
+            if not _HOTKEY_RE.fullmatch(edit.text().lower()):
+                QMessageBox.warning(self, "警告", f"{name}快捷键格式无效: {edit.text()}")
+                return False
+        
         try:
             # 收集配置
             self.config['hotkey_start_stop'] = self.hotkey_start.text()
             self.config['hotkey_cancel'] = self.hotkey_cancel.text()
             
-            # 输出模式
-            for btn in self.output_mode_group.buttons():
-                if btn.isChecked():
-                    self.config['output_mode'] = btn.property('value')
-                    break
+            # 输出模式（按钮组互斥，直接取选中的按钮）
+            checked = self.output_mode_group.checkedButton()
+            if checked is not None:
+                self.config['output_mode'] = checked.property('value')
             
             self.config['language'] = self.lang_combo.currentText()
             self.config['itn'] = self.itn_check.isChecked()
             self.config['use_vad'] = self.vad_check.isChecked()
             
             # 热词
-            hotwords_text = self.hotwords_edit.toPlainText().strip()
-            if hotwords_text:
-                self.config['hotwords'] = [w.strip() for w in hotwords_text.split('\n') if w.strip()]
-            else:
-                self.config['hotwords'] = []
+            self.config['hotwords'] = list(filter(None, map(str.strip, self.hotwords_edit.toPlainText().splitlines())))
             
             self.config['api_enabled'] = self.api_check.isChecked()
             self.config['api_port'] = self.port_spin.value()
@@ -386,89 +534,81 @@ class SettingsWindow(QMainWindow):
             device_idx = self.device_combo.currentData()
             self.config['audio_device'] = device_idx if device_idx and device_idx >= 0 else None
             
-            # 写入文件
-            with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+            # 先在内存中生成完整文本，写入临时文件并落盘后原子替换，中途崩溃不会留下写了一半的配置
+            text = yaml.dump(self.config, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                             allow_unicode=True, default_flow_style=False, sort_keys=False)
+            tmp_path = CONFIG_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, CONFIG_PATH)
             
             QMessageBox.information(self, "成功", f"配置已保存到:\n{CONFIG_PATH}")
             print(f"✓ 配置已保存: {CONFIG_PATH}")
+            return True
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"保存失败:\n{e}")
+            return False
     
     def kill_existing_processes(self):
         """终止之前运行的进程"""
         import subprocess
         
-        # 终止 funasr_live.py 进程
+        # 合并为一条 shell 命令：pkill 终止 funasr_live.py，lsof 查出占用 API 端口的进程后一次 kill；
+        # 模式写成 [f]unasr_... 以免 pkill 匹配到这条 sh 命令自身。
+        # 绝对路径 + close_fds=False 让 subprocess 走 posix_spawn，免去 fork 与逐个关闭描述符
+        port = int(self.config.get('api_port', 8765))
         try:
-            result = subprocess.run(
-                ['pgrep', '-f', 'funasr_live.py'],
-                capture_output=True,
-                text=True
+            subprocess.run(
+                ['/bin/sh', '-c',
+                 "pkill -9 -f '[f]unasr_live.py'; "
+                 f'pids=$(lsof -ti :{port}); [ -n "$pids" ] && kill -9 $pids'],
+                capture_output=True, timeout=2, close_fds=False
             )
-            if result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                for pid in pids:
-                    if pid:
-                        try:
-                            subprocess.run(['kill', '-9', pid], check=True)
-                            print(f"已终止进程 PID: {pid}")
-                        except:
-                            pass
-        except:
-            pass
-        
-        # 终止占用 API 端口的进程
-        port = self.config.get('api_port', 8765)
-        try:
-            result = subprocess.run(
-                ['lsof', '-ti', f':{port}'],
-                capture_output=True,
-                text=True
-            )
-            if result.stdout.strip():
-                pids = result.stdout.strip().split('\n')
-                for pid in pids:
-                    if pid:
-                        try:
-                            subprocess.run(['kill', '-9', pid], check=True)
-                            print(f"已终止占用端口 {port} 的进程 PID: {pid}")
-                        except:
-                            pass
-        except:
-            pass
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"终止旧进程失败: {e}")
+    
+    def closeEvent(self, event):
+        """关闭窗口时释放麦克风测试的输入流"""
+        if self.test_thread is not None:
+            self.test_thread.wait()
+            self.test_thread.close_stream()
+        super().closeEvent(event)
     
     def save_and_start(self):
         """保存并启动"""
-        self.save_config()
+        if not self.save_config():
+            return
         
         # 先终止之前的进程
         self.kill_existing_processes()
         
         # 等待端口释放
-        import time
-        time.sleep(0.5)
+        _wait_port_free(self.config.get('api_host', '127.0.0.1'), int(self.config.get('api_port', 8765)))
         
         self.close()
         
-        # 启动主程序
+        # 启动主程序；close_fds=False 时 subprocess 使用 posix_spawn 而非 fork+exec，
+        # Python 创建的描述符默认不可继承，不会泄漏给子进程
         import subprocess
         script_dir = os.path.dirname(os.path.abspath(__file__))
         subprocess.Popen([
             sys.executable,
             os.path.join(script_dir, "funasr_live.py")
-        ])
+        ], close_fds=False)
 
 
 def main():
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     
-    # 设置字体
-    font = QFont()
-    font.setPointSize(13)
-    app.setFont(font)
+    # 设置字体；默认字号已是 13 时不再调用 setFont，避免 Qt 重新解析全部控件的字体
+    font = app.font()
+    if font.pointSize() != 13:
+        font.setPointSize(13)
+        app.setFont(font)
     
     window = SettingsWindow()
     window.show()
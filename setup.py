@@ -39,11 +39,18 @@ setup(
         "numpy>=1.21.0",
         "PyYAML>=6.0",
         "pynput>=1.7.6",
+        "psutil>=6.0.0",
+        "pyobjc-framework-Cocoa>=9.0; sys_platform == 'darwin'",
+        "pyobjc-framework-Quartz>=9.0; sys_platform == 'darwin'",
         "pyperclip>=1.8.2",
         "PyQt5>=5.15.0",
         "fastapi>=0.100.0",
         "uvicorn>=0.22.0",
         "websockets>=11.0",
+        "msgspec>=0.18.0",
+        "orjson>=3.9.0",
+        "uvloop>=0.17.0; sys_platform != 'win32'",
+        "httptools>=0.5.0",
     ],
     entry_points={
         "console_scripts": [